@@ -0,0 +1,295 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import current_app, has_app_context, has_request_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from sqlalchemy import event, inspect
+from database import db, RoutingSession
+from models import AuditLog, User, ClientPlan, ClientPlanVehicle, Vehicle
+
+# Entities whose changes are recorded, and columns never written to the trail
+AUDITED_MODELS = (User, ClientPlan, ClientPlanVehicle, Vehicle)
+REDACTED_COLUMNS = {"password_hash", "client_signature"}
+
+
+# -------------------------------
+# Change Capture (Session Events)
+# -------------------------------
+@event.listens_for(RoutingSession, "after_flush")
+def _capture_changes(session, flush_context):
+    """
+    Collects before/after diffs while attribute history is still available.
+    Entries wait in session.info until the transaction commits.
+    """
+    if not _enabled():
+        return
+
+    entries = session.info.setdefault("audit_pending", [])
+    user_id = None
+    if session.new or session.dirty or session.deleted:
+        user_id = _current_user_id()
+
+    for action, objects in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            if not isinstance(obj, AUDITED_MODELS):
+                continue
+            changes = _diff(obj, action)
+            if action == "update" and not changes:
+                continue
+            entries.append({
+                "entity_type": obj.__tablename__,
+                "entity_id": ":".join(str(v) for v in inspect(obj).mapper.primary_key_from_instance(obj)),
+                "action": action,
+                "changes": json.dumps(changes, default=str),
+                "user_id": user_id,
+                "logged_at": datetime.utcnow()
+            })
+
+
+def record(session, entity_type, entity_id, action, changes):
+    """
+    Queues an entry for a set-based write (bulk INSERT/UPDATE) that bypasses
+    the ORM flush. Published on commit like captured changes.
+    """
+    if not _enabled():
+        return
+
+    session.info.setdefault("audit_pending", []).append({
+        "entity_type": entity_type,
+        "entity_id": str(entity_id),
+        "action": action,
+        "changes": json.dumps(changes, default=str),
+        "user_id": _current_user_id(),
+        "logged_at": datetime.utcnow()
+    })
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _publish_changes(session):
+    entries = session.info.pop("audit_pending", None)
+    if entries and _enabled():
+        audit_writer.enqueue(current_app._get_current_object(), entries)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("audit_pending", None)
+
+
+def _enabled():
+    """Audit is on for apps created with AUDIT_ENABLED (see create_app)."""
+    return has_app_context() and "audit" in current_app.extensions
+
+
+def _diff(obj, action):
+    changes = {}
+    state = inspect(obj)
+    for attr in state.mapper.column_attrs:
+        key = attr.key
+        history = state.attrs[key].history
+        if action == "update" and not history.has_changes():
+            continue
+
+        # Read from state.dict so expired/server-default columns never trigger a SELECT
+        before = history.deleted[0] if history.deleted else None
+        after = history.added[0] if history.added else state.dict.get(key)
+        if action == "delete":
+            before, after = state.dict.get(key), None
+
+        if key in REDACTED_COLUMNS:
+            before = "<redacted>" if before is not None else None
+            after = "<redacted>" if after is not None else None
+        changes[key] = [before, after]
+    return changes
+
+
+def _current_user_id():
+    """Acting user from the request's JWT, or None outside authenticated requests."""
+    if not has_request_context():
+        return None
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+        return int(identity) if identity is not None else None
+    except Exception:
+        return None
+
+
+# -------------------------------
+# Buffered Batch Writer
+# -------------------------------
+class AuditWriter:
+    """
+    Writes audit entries in batches from a background thread, so committing
+    a request never waits on the audit table.
+
+    The queue is written every AUDIT_FLUSH_INTERVAL seconds, or as soon as
+    AUDIT_BATCH_SIZE entries are waiting, in INSERTs of up to that many rows.
+
+    A batch that fails to insert goes back on the queue and is retried with
+    backoff (doubling up to AUDIT_RETRY_MAX seconds), so a DB outage delays
+    the trail but doesn't lose it. Whatever is still unwritten at shutdown
+    is spilled to AUDIT_SPILL_DIR and re-queued by the next writer started.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._app = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def init_app(self, app):
+        app.config.setdefault('AUDIT_BATCH_SIZE', 200)
+        app.config.setdefault('AUDIT_FLUSH_INTERVAL', 2.0)  # seconds
+        app.config.setdefault('AUDIT_RETRY_MAX', 60.0)  # seconds between retries, at most
+        app.config.setdefault('AUDIT_SPILL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'audit-spill'))
+        app.extensions["audit"] = self
+
+        # Batch size/interval come from the first app; every app's entries
+        # are still written to that app's own database
+        if self._app is None:
+            self._app = app
+            atexit.register(self._shutdown)
+
+    def enqueue(self, app, entries):
+        if self._app is None:
+            return
+        for entry in entries:
+            self._queue.put((app, entry))
+        self._ensure_thread()
+        if self._queue.qsize() >= self._app.config['AUDIT_BATCH_SIZE']:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        # Started lazily (and restarted after a fork) so each worker has its own
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        self._load_spilled()
+        delay = None
+        while True:
+            if delay is None:
+                self._wakeup.wait(self._app.config['AUDIT_FLUSH_INTERVAL'])
+            else:
+                time.sleep(delay)  # Backing off: a full queue doesn't cut the wait short
+            self._wakeup.clear()
+            if self.flush():
+                delay = None
+            else:
+                delay = min((delay or self._app.config['AUDIT_FLUSH_INTERVAL']) * 2, self._app.config['AUDIT_RETRY_MAX'])
+
+    def _take_batch(self):
+        batch_size = self._app.config['AUDIT_BATCH_SIZE']
+        batch = []
+        try:
+            while len(batch) < batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write(self, batch):
+        """Inserts the batch; returns the (app, entry) pairs that could not be written."""
+        by_app = {}
+        for app, entry in batch:
+            by_app.setdefault(app, []).append(entry)
+
+        # Bypasses the ORM session: one multi-row INSERT per app on its own connection
+        failed = []
+        for app, entries in by_app.items():
+            with app.app_context():
+                try:
+                    with db.engine.begin() as conn:
+                        conn.execute(AuditLog.__table__.insert(), entries)
+                except Exception:
+                    app.logger.exception("Failed to write %d audit entries; keeping them queued", len(entries))
+                    failed.extend((app, entry) for entry in entries)
+        return failed
+
+    def flush(self):
+        """
+        Writes everything still buffered (used at shutdown and in tests).
+        Returns False if a batch failed; it is back on the queue for later.
+        """
+        if self._app is None:
+            return True
+        # Entries stay in the queue until written, so a flush at shutdown
+        # never misses a batch the writer thread was still collecting
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return True
+                failed = self._write(batch)
+                if failed:
+                    for item in failed:
+                        self._queue.put(item)
+                    return False
+
+    # -------------------------------
+    # Spill File (entries unwritten at shutdown)
+    # -------------------------------
+    def _shutdown(self):
+        if not self.flush():
+            self._spill()
+
+    def _spill(self):
+        with self._flush_lock:
+            entries = [entry for _, entry in self._take_all()]
+        if not entries:
+            return
+        directory = self._app.config['AUDIT_SPILL_DIR']
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"audit-{os.getpid()}-{int(time.time())}.jsonl")
+        with open(path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+        self._app.logger.error("Wrote %d unsaved audit entries to %s", len(entries), path)
+
+    def _load_spilled(self):
+        """Re-queues entries spilled by earlier processes (each file is claimed by one worker)."""
+        directory = self._app.config['AUDIT_SPILL_DIR']
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".jsonl"):
+                continue
+            path = os.path.join(directory, name)
+            claimed = f"{path}.{os.getpid()}"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue  # Another worker got it first
+            with open(claimed) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entry["logged_at"] = datetime.fromisoformat(entry["logged_at"])
+                        self._queue.put((self._app, entry))
+            os.remove(claimed)
+
+    def _take_all(self):
+        items = []
+        try:
+            while True:
+                items.append(self._queue.get_nowait())
+        except queue.Empty:
+            return items
+
+
+audit_writer = AuditWriter()
+
+
+def init_audit(app):
+    audit_writer.init_app(app)
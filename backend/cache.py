@@ -0,0 +1,203 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from database import RoutingSession
+
+
+# -------------------------------
+# Backends
+# -------------------------------
+class LocalBackend:
+    """
+    In-process LRU with per-entry TTL.
+
+    Also the stand-in for the shared backend in tests: it implements the
+    same get/set/tag interface, just within one process.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def tag_versions(self, tags):
+        with self._lock:
+            return tuple(self._tags.get(tag, 0) for tag in tags)
+
+    def bump_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tags[tag] = self._tags.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+
+class RedisBackend:
+    """Shared backend so every gunicorn worker sees the same entries and tags."""
+
+    def __init__(self, url, prefix="powertrack:cache:"):
+        # Optional dependency, imported only when this backend is configured
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND is 'redis' but the redis package is not installed")
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self._prefix + key)
+        return (None, pickle.loads(raw)) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(self._prefix + key, pickle.dumps(value), ex=max(int(ttl), 1))
+
+    def tag_versions(self, tags):
+        values = self._client.mget([self._prefix + "tag:" + tag for tag in tags])
+        return tuple(int(v or 0) for v in values)
+
+    def bump_tags(self, tags):
+        pipe = self._client.pipeline()
+        for tag in tags:
+            pipe.incr(self._prefix + "tag:" + tag)
+        pipe.execute()
+
+    def clear(self):
+        keys = list(self._client.scan_iter(self._prefix + "*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+# -------------------------------
+# Cache Facade
+# -------------------------------
+class ResultCache:
+    """
+    Caches service-layer results keyed by function + arguments.
+
+    Invalidation is tag based: each cached function lists the tables it reads,
+    and keys embed the current version of those tags. Bumping a tag (done
+    automatically when a commit touches that table) makes old entries
+    unreachable without scanning for them. Set-based statements that bypass
+    the ORM flush must call invalidate() themselves.
+    """
+
+    def __init__(self):
+        self.backend = LocalBackend()  # Used outside an app context
+        self.default_ttl = 300
+        self.stats = {}
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'local')  # 'local' or 'redis'
+        app.config.setdefault('CACHE_DEFAULT_TTL', 300)  # seconds
+        app.config.setdefault('CACHE_MAX_ENTRIES', 1024)
+
+        # One backend per app, so test apps on different databases never share entries
+        if app.config['CACHE_BACKEND'] == 'redis':
+            app.extensions["result_cache"] = RedisBackend(app.config['CACHE_REDIS_URL'])
+        else:
+            app.extensions["result_cache"] = LocalBackend(app.config['CACHE_MAX_ENTRIES'])
+
+    def _backend(self):
+        if has_app_context():
+            return current_app.extensions.get("result_cache", self.backend)
+        return self.backend
+
+    def _ttl(self, ttl):
+        if ttl:
+            return ttl
+        if has_app_context():
+            return current_app.config.get('CACHE_DEFAULT_TTL', self.default_ttl)
+        return self.default_ttl
+
+    def cached(self, tags, ttl=None):
+        """Decorator for service methods whose result only depends on `tags`."""
+
+        def decorator(fn):
+            name = f"{fn.__module__}.{fn.__qualname__}"
+            counters = self.stats.setdefault(name, {"hits": 0, "misses": 0})
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                backend = self._backend()
+                versions = backend.tag_versions(tags)
+                key = f"{name}:{args!r}:{sorted(kwargs.items())!r}:{versions}"
+
+                item = backend.get(key)
+                if item is not None:
+                    counters["hits"] += 1
+                    return item[1]
+
+                counters["misses"] += 1
+                value = fn(*args, **kwargs)
+                backend.set(key, value, self._ttl(ttl))
+                return value
+
+            return wrapper
+
+        return decorator
+
+    def is_shared(self):
+        """True when every worker sees the same entries and tag bumps (redis backend)."""
+        return isinstance(self._backend(), RedisBackend)
+
+    def invalidate(self, *tags):
+        if tags:
+            self._backend().bump_tags(tags)
+
+    def get_stats(self):
+        return {name: dict(counters) for name, counters in self.stats.items()}
+
+
+cache = ResultCache()
+
+
+def init_cache(app):
+    cache.init_app(app)
+
+
+# -------------------------------
+# Invalidation on Commit
+# -------------------------------
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_tables(session, flush_context):
+    tables = session.info.setdefault("cache_tables", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tables.add(obj.__tablename__)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _invalidate_tables(session):
+    tables = session.info.pop("cache_tables", None)
+    if tables:
+        cache.invalidate(*sorted(tables))
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_tables(session):
+    session.info.pop("cache_tables", None)
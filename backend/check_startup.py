@@ -0,0 +1,71 @@
+"""
+Cold-start budget check for the Flask app.
+
+Starts a fresh interpreter with `python -X importtime`, imports the app and
+calls create_app() against in-memory SQLite, then:
+- prints the slowest imports (cumulative time)
+- exits 1 if the whole boot took longer than the budget
+
+Usage:
+    python check_startup.py [--budget-ms 1000] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BOOT_SNIPPET = (
+    "from app import create_app; "
+    "create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})"
+)
+
+
+def parse_importtime(stderr):
+    """Returns [(cumulative_us, depth, module)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        rows.append((int(cumulative.strip()), depth, module.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=int, default=int(os.environ.get("STARTUP_BUDGET_MS", 1000)))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT_SNIPPET],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        print("App failed to boot.")
+        return 1
+
+    # Entry points and their direct imports; cumulative time includes children
+    top_level = [(us, mod) for us, depth, mod in parse_importtime(result.stderr) if depth <= 1]
+    print("Slowest imports (top two levels):")
+    for us, module in sorted(top_level, reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+
+    print(f"Cold start: {elapsed_ms:.0f} ms (budget {args.budget_ms} ms)")
+    if elapsed_ms > args.budget_ms:
+        print("Over budget.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Concurrency check for vehicle registration.
+
+Starts N threads that register the same plates at the same moment, mixing
+VehicleService.create_vehicle and ClientPlanVehicleService.add_vehicle and
+spelling each plate differently ("ab-12 3" vs "AB123"), then verifies:
+- no thread got an error
+- each plate exists exactly once, and every thread got that row's id
+- no plate was reported created more than once
+- each plate is linked to the plan once
+
+Runs against a throwaway SQLite file by default. Point --database-uri at a
+scratch MySQL schema to exercise the INSERT IGNORE path (tables are created
+if missing; the check's plates are removed first).
+
+Usage:
+    python check_upsert_race.py [--threads 16] [--plates 20] [--database-uri URI]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from collections import defaultdict
+
+
+def spellings(plate):
+    """The same plate as different lanes might type it."""
+    return [plate, plate.lower(), f"{plate[:2]}-{plate[2:]}", f"{plate[:3]} {plate[3:]}"]
+
+
+def run(app, threads, plates):
+    from database import db
+    from models import Vehicle, VehicleCategory, ClientPlan, ClientPlanVehicle
+    from services.vehicle_service import VehicleService
+    from services.client_plan_service import ClientPlanVehicleService
+
+    plate_numbers = [f"RACE{i:03d}" for i in range(plates)]
+
+    with app.app_context():
+        db.create_all()
+        category = VehicleCategory.query.first()
+        if category is None:
+            category = VehicleCategory(category_name="Car")
+            db.session.add(category)
+        plan = ClientPlan(client_name="Race check", billing_cycle_type="monthly", client_signature=b"")
+        db.session.add(plan)
+        db.session.flush()
+
+        ids = [vid for (vid,) in db.session.query(Vehicle.vehicle_id).filter(Vehicle.license_plate.in_(plate_numbers))]
+        ClientPlanVehicle.query.filter(ClientPlanVehicle.vehicle_id.in_(ids)).delete(synchronize_session=False)
+        Vehicle.query.filter(Vehicle.vehicle_id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        category_id, plan_id = category.vehicle_category_id, plan.client_plan_id
+
+    barrier = threading.Barrier(threads)
+    results = defaultdict(list)  # plate -> [(vehicle_id, created)]
+    errors = []
+    lock = threading.Lock()
+
+    def worker(index):
+        with app.app_context():
+            barrier.wait()
+            for plate in plate_numbers:
+                typed = spellings(plate)[index % 4]
+                try:
+                    if index % 2:
+                        vehicle, created = VehicleService.create_vehicle(typed, None, category_id)
+                        outcome = (vehicle.vehicle_id, created)
+                    else:
+                        link = ClientPlanVehicleService.add_vehicle(plan_id, typed, category_id)
+                        outcome = (link.vehicle_id, None)
+                except Exception as e:
+                    with lock:
+                        errors.append(f"thread {index}, {typed}: {e}")
+                    continue
+                with lock:
+                    results[plate].append(outcome)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    problems = list(errors)
+    with app.app_context():
+        rows = dict(db.session.query(Vehicle.license_plate, Vehicle.vehicle_id)
+                    .filter(Vehicle.license_plate.in_(plate_numbers)))
+        linked = defaultdict(int)
+        for (vehicle_id,) in db.session.query(ClientPlanVehicle.vehicle_id).filter_by(client_plan_id=plan_id):
+            linked[vehicle_id] += 1
+
+    for plate in plate_numbers:
+        if plate not in rows:
+            problems.append(f"{plate}: not stored")
+            continue
+        seen = {vehicle_id for vehicle_id, _ in results[plate]}
+        if seen != {rows[plate]}:
+            problems.append(f"{plate}: threads saw ids {sorted(seen)}, stored {rows[plate]}")
+        if linked[rows[plate]] != 1:
+            problems.append(f"{plate}: linked {linked[rows[plate]]} times")
+
+        # add_vehicle doesn't report it, so only create_vehicle's flags are counted
+        created = sum(1 for _, c in results[plate] if c)
+        if created > 1:
+            problems.append(f"{plate}: created {created} times")
+
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--plates", type=int, default=20)
+    parser.add_argument("--database-uri", default=None)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app import create_app
+
+    config = {"AUDIT_ENABLED": False}
+    if args.database_uri:
+        config["SQLALCHEMY_DATABASE_URI"] = args.database_uri
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "race.db")
+        config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"timeout": 30}}
+
+    problems = run(create_app(config), args.threads, args.plates)
+    for problem in problems:
+        print(problem)
+    print(f"{args.threads} threads x {args.plates} plates: {'FAILED' if problems else 'ok'}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+
+# -------------------------------
+# CLI Jobs
+# -------------------------------
+@click.command("archive-transactions")
+@click.option("--horizon-days", type=int, default=None, help="Defaults to ARCHIVE_HORIZON_DAYS.")
+@click.option("--batch-size", type=int, default=500, show_default=True)
+@click.option("--dry-run", is_flag=True, help="Only report what would be archived.")
+@with_appcontext
+def archive_transactions(horizon_days, batch_size, dry_run):
+    """Move closed months of transactions into the archive tables (safe to re-run)."""
+    # Loaded only when the job runs, not on every worker boot
+    from database import db
+    from models import ARCHIVE_TABLES
+    from services.archive_service import ArchiveService
+
+    if horizon_days is None:
+        horizon_days = current_app.config['ARCHIVE_HORIZON_DAYS']
+    db.metadata.create_all(db.engine, tables=list(ARCHIVE_TABLES.values()))
+
+    cutoff = ArchiveService.archive_cutoff(horizon_days)
+    periods = ArchiveService.pending_periods(cutoff)
+    if not periods:
+        click.echo(f"Nothing to archive before {cutoff} (months with days not closed out are kept).")
+        return
+
+    for month in periods:
+        moved = ArchiveService.archive_period(month, batch_size=batch_size, dry_run=dry_run)
+        click.echo(f"{month:%Y-%m}: {'would move' if dry_run else 'moved'} {moved} transactions")
+
+
+@click.command("profile-report")
+@click.option("--dir", "directory", default=None, help="Defaults to PROFILE_DIR.")
+@click.option("--top", type=int, default=10, show_default=True)
+@click.option("--sort", type=click.Choice(["wall", "sql", "statements"]), default="wall", show_default=True)
+@with_appcontext
+def profile_report(directory, top, sort):
+    """Summarize sampled service-method profiles: slowest methods and their heaviest SQL."""
+    import glob
+    import json
+    import os
+
+    directory = directory or current_app.config.get('PROFILE_DIR') or os.path.join(current_app.root_path, 'profiles')
+    by_name = {}
+    for path in glob.glob(os.path.join(directory, "profile-*.jsonl")):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    by_name.setdefault(record["name"], []).append(record)
+
+    if not by_name:
+        click.echo(f"No profiles in {directory}.")
+        return
+
+    rows = []
+    for name, records in by_name.items():
+        walls = sorted(r["wall_ms"] for r in records)
+        rows.append({
+            "name": name,
+            "calls": len(records),
+            "wall": sum(walls) / len(walls),
+            "p95": walls[min(len(walls) - 1, int(len(walls) * 0.95))],
+            "sql": sum(r["sql_ms"] for r in records) / len(records),
+            "statements": sum(r["statement_count"] for r in records) / len(records),
+            "records": records
+        })
+    rows.sort(key=lambda r: -r[sort])
+
+    click.echo(f"{'method':<55} {'calls':>6} {'avg ms':>9} {'p95 ms':>9} {'sql ms':>9} {'stmts':>7}")
+    for row in rows[:top]:
+        click.echo(
+            f"{row['name']:<55} {row['calls']:>6} {row['wall']:>9.1f} {row['p95']:>9.1f} "
+            f"{row['sql']:>9.1f} {row['statements']:>7.1f}"
+        )
+
+        # The statement repeated most within one call is usually the N+1 culprit
+        worst = max(
+            (s for r in row["records"] for s in r["statements"]),
+            key=lambda s: (s["count"], s["ms"]),
+            default=None
+        )
+        if worst:
+            sql = " ".join(worst["sql"].split())
+            click.echo(f"    x{worst['count']} per call, {worst['ms']:.1f} ms: {sql[:110]}")
+            for plan_row in (worst.get("explain") or [])[:3]:
+                click.echo(f"      {plan_row}")
+
+
+def register_cli(app):
+    app.cli.add_command(archive_transactions)
+    app.cli.add_command(profile_report)
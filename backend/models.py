@@ -109,6 +109,8 @@ class ClientPlan(db.Model):
     client_signature = db.Column(db.LargeBinary, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    usage_limit = db.Column(db.Integer, nullable=True) # NULL = unlimited per billing cycle
+    usage_unit = db.Column(db.Enum('washes', 'services'), nullable=False, default='washes')
 
 class ClientPlanVehicle(db.Model):
     __tablename__ = 'client_plan_vehicles'
@@ -117,6 +119,16 @@ class ClientPlanVehicle(db.Model):
     assigned_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     removed_at = db.Column(db.DateTime, nullable=True)
 
+class ClientPlanUsage(db.Model):
+    """
+    Maintained usage counter per plan and billing cycle.
+    Updated with a conditional UPDATE so concurrent lanes cannot exceed the limit.
+    """
+    __tablename__ = 'client_plan_usage'
+    client_plan_id = db.Column(db.Integer, db.ForeignKey('client_plans.client_plan_id'), primary_key=True)
+    cycle_start = db.Column(db.Date, primary_key=True)
+    used_count = db.Column(db.Integer, nullable=False, default=0)
+
 # ----------------------------------------------------------------             
 # TRANSACTIONS
 # ----------------------------------------------------------------             
@@ -131,6 +143,8 @@ class WashTransaction(db.Model):
     created_by_user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     logged_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     notes = db.Column(db.Text, nullable=True)
+    # Corrections never edit the row: they append 'void'/'refund' adjustments
+    status = db.Column(db.Enum('completed', 'voided', 'refunded'), nullable=False, default='completed')
 
 class WashTransactionService(db.Model):
     __tablename__ = 'wash_transaction_services'
@@ -148,6 +162,92 @@ class WashTransactionAdjustment(db.Model):
     __tablename__ = 'wash_transaction_adjustments'
     adjustment_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     wash_transaction_id = db.Column(db.Integer, db.ForeignKey('wash_transactions.wash_transaction_id'), nullable=False)
-    adjustment_type = db.Column(db.Enum('discount', 'fee'), nullable=False)
+    # discount/fee are applied at submit time and included in total_price.
+    # void/refund are later reversing entries subtracted from it (see REVERSAL_TYPES).
+    adjustment_type = db.Column(db.Enum('discount', 'fee', 'void', 'refund'), nullable=False)
     adjustment_amount = db.Column(db.Numeric(10, 2), nullable=False)
-    adjustment_reason = db.Column(db.String(100), nullable=True)
\ No newline at end of file
+    adjustment_reason = db.Column(db.String(100), nullable=True)
+    adjusted_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    created_by_user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=True)
+
+# Adjustment types that reverse revenue after the ticket was committed
+REVERSAL_TYPES = ('void', 'refund')
+
+# ----------------------------------------------------------------             
+# TRANSACTION ARCHIVE
+# ----------------------------------------------------------------             
+
+def _archive_table(model):
+    """
+    Builds '<table>_archive' with the same columns as the live table, plus
+    archive_period (YYYYMM of the parent ticket) leading the primary key.
+
+    On MySQL the table is ROW_FORMAT=COMPRESSED and RANGE-partitioned on
+    archive_period: one partition per archived month, split off the catch-all
+    p_future by the archive job (ArchiveService._ensure_partition), so
+    period-bounded reports only touch their months' partitions.
+    No foreign keys: archived rows outlive whatever they referenced.
+    """
+    columns = [db.Column('archive_period', db.Integer, primary_key=True, autoincrement=False)]
+    for col in model.__table__.columns:
+        columns.append(db.Column(
+            col.name,
+            col.type.copy(),
+            primary_key=col.primary_key,
+            nullable=col.nullable,
+            autoincrement=False
+        ))
+    return db.Table(
+        model.__tablename__ + '_archive',
+        *columns,
+        mysql_row_format='COMPRESSED',
+        mysql_partition_by='RANGE (archive_period) (PARTITION p_future VALUES LESS THAN MAXVALUE)'
+    )
+
+# Live model -> archive table, parent first
+ARCHIVE_TABLES = {
+    model: _archive_table(model)
+    for model in (WashTransaction, WashTransactionService, WashTransactionEmployee, WashTransactionAdjustment)
+}
+
+# ----------------------------------------------------------------             
+# AUDIT TRAIL
+# ----------------------------------------------------------------             
+
+class AuditLog(db.Model):
+    """Append-only history of changes to audited entities (see audit.py)."""
+    __tablename__ = 'audit_log'
+    audit_id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    entity_type = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.String(50), nullable=False)
+    action = db.Column(db.Enum('insert', 'update', 'delete'), nullable=False)
+    changes = db.Column(db.Text, nullable=False) # JSON: {"column": [before, after]}
+    user_id = db.Column(db.Integer, nullable=True) # Acting user from the JWT, if any
+    logged_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (db.Index('ix_audit_entity', 'entity_type', 'entity_id'),)
+
+# ----------------------------------------------------------------             
+# DAILY CLOSE-OUT
+# ----------------------------------------------------------------             
+
+class DailyCloseout(db.Model):
+    """Frozen end-of-day totals (see CloseoutService). Never updated once written."""
+    __tablename__ = 'daily_closeouts'
+    business_date = db.Column(db.Date, primary_key=True)
+    transaction_count = db.Column(db.Integer, nullable=False)
+    gross_total = db.Column(db.Numeric(12, 2), nullable=False) # Tickets logged that day
+    reversed_total = db.Column(db.Numeric(12, 2), nullable=False) # Void/refund entered that day
+    net_total = db.Column(db.Numeric(12, 2), nullable=False)
+    closed_by_user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=True)
+    closed_at = db.Column(db.DateTime, nullable=False)
+
+class DailyCloseoutLine(db.Model):
+    __tablename__ = 'daily_closeout_lines'
+    business_date = db.Column(db.Date, db.ForeignKey('daily_closeouts.business_date'), primary_key=True)
+    # payment: by payment_method | reversal: void/refund by the ticket's payment_method
+    # adjustment: by "type:reason" | employee: tickets worked, by user_id
+    line_type = db.Column(db.Enum('payment', 'reversal', 'adjustment', 'employee'), primary_key=True)
+    line_key = db.Column(db.String(120), primary_key=True)
+    line_count = db.Column(db.Integer, nullable=False)
+    line_amount = db.Column(db.Numeric(12, 2), nullable=False)
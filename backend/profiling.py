@@ -0,0 +1,198 @@
+import json
+import os
+import random
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+THIS_FILE = os.path.abspath(__file__)
+BACKEND_DIR = os.path.dirname(THIS_FILE)
+
+# The profile being recorded on this thread/request, if any
+_current = ContextVar("profile", default=None)
+
+
+# -------------------------------
+# Decorator
+# -------------------------------
+def profiled(fn):
+    """
+    Opt-in profiling for a service method (put it under @staticmethod).
+
+    When PROFILE_ENABLED is on, a PROFILE_SAMPLE_RATE share of calls record
+    wall time and every SQL statement with its duration and calling stack
+    (plus EXPLAIN output per distinct SELECT with PROFILE_EXPLAIN). Unsampled
+    calls only pay for one random() call. See `flask profile-report` for the summary.
+    """
+    name = fn.__qualname__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        profiler = _profiler()
+        if profiler is None or _current.get() is not None or random.random() >= profiler.sample_rate:
+            return fn(*args, **kwargs)
+
+        profile = {"name": name, "statements": []}
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            wall = time.perf_counter() - started
+            _current.reset(token)
+            profiler.save(profile, wall)
+
+    return wrapper
+
+
+def _profiler():
+    if has_app_context():
+        return current_app.extensions.get("profiler")
+    return None
+
+
+# -------------------------------
+# Statement Capture (all engines, registered by init_profiling)
+# -------------------------------
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["profile_started"] = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    started = conn.info.pop("profile_started", None)
+    if profile is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    profile["statements"].append({
+        "sql": statement,
+        "parameters": parameters,
+        "engine": conn.engine,
+        "seconds": elapsed,
+        "stack": _app_stack()
+    })
+
+
+def _app_stack():
+    """Our own frames between the profiled method and the ORM call, outermost first."""
+    frames = []
+    for frame in traceback.extract_stack()[:-2]:
+        filename = os.path.abspath(frame.filename)
+        if filename == THIS_FILE:
+            frames = []  # Drop everything above the profiled wrapper
+            continue
+        if filename.startswith(BACKEND_DIR) and "site-packages" not in filename:
+            frames.append(f"{frame.name} ({os.path.basename(frame.filename)})")
+    return frames
+
+
+# -------------------------------
+# Profiler
+# -------------------------------
+class Profiler:
+    """
+    Writes sampled profiles to PROFILE_DIR, one pair of files per process:
+
+    - profile-<pid>.jsonl: one record per call (wall/SQL time, statements
+      grouped by SQL text with counts; EXPLAIN per distinct SELECT when
+      PROFILE_EXPLAIN is on)
+    - stacks-<pid>.folded: folded stacks weighted in microseconds, for
+      flamegraph.pl / speedscope. SQL time is a leaf under the Python frame
+      that issued it; the rest of the wall time sits on the method itself.
+    """
+
+    def __init__(self, app):
+        app.config.setdefault('PROFILE_SAMPLE_RATE', 0.1)  # share of calls profiled
+        app.config.setdefault('PROFILE_DIR', os.path.join(BACKEND_DIR, 'profiles'))
+        # Extra DB round trips on the sampled request: for staging/local runs, not production
+        app.config.setdefault('PROFILE_EXPLAIN', False)
+        self.sample_rate = app.config['PROFILE_SAMPLE_RATE']
+        self.directory = app.config['PROFILE_DIR']
+        self.explain = app.config['PROFILE_EXPLAIN']
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def save(self, profile, wall):
+        statements = profile["statements"]
+        sql_seconds = sum(s["seconds"] for s in statements)
+
+        grouped = {}
+        for s in statements:
+            entry = grouped.setdefault(s["sql"], {"sql": s["sql"], "count": 0, "ms": 0.0, "first": s})
+            entry["count"] += 1
+            entry["ms"] += s["seconds"] * 1000
+
+        record = {
+            "name": profile["name"],
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "wall_ms": round(wall * 1000, 3),
+            "sql_ms": round(sql_seconds * 1000, 3),
+            "statement_count": len(statements),
+            "statements": [
+                {
+                    "sql": entry["sql"],
+                    "count": entry["count"],
+                    "ms": round(entry["ms"], 3),
+                    "explain": self._explain(entry["first"]) if self.explain else None
+                }
+                for entry in sorted(grouped.values(), key=lambda e: -e["ms"])
+            ]
+        }
+
+        folded = [
+            (";".join([profile["name"]] + s["stack"] + ["SQL " + _summarize(s["sql"])]), s["seconds"])
+            for s in statements
+        ]
+        folded.append((profile["name"], max(wall - sql_seconds, 0)))
+
+        pid = os.getpid()
+        with self._lock:
+            with open(os.path.join(self.directory, f"profile-{pid}.jsonl"), "a") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+            with open(os.path.join(self.directory, f"stacks-{pid}.folded"), "a") as f:
+                for stack, seconds in folded:
+                    f.write(f"{stack} {max(int(seconds * 1_000_000), 1)}\n")
+
+    def _explain(self, statement):
+        """Plan for a SELECT, run on the engine that executed it (after the call, so not captured)."""
+        if not statement["sql"].lstrip().upper().startswith("SELECT"):
+            return None
+        engine = statement["engine"]
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            with engine.connect() as conn:
+                rows = conn.exec_driver_sql(prefix + statement["sql"], statement["parameters"]).all()
+            return [list(row) for row in rows]
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+
+
+def _summarize(sql):
+    """'SELECT ... FROM services ...' -> 'SELECT services' (short, flamegraph-safe frame name)."""
+    words = sql.replace(";", " ").replace("`", "").replace('"', "").split()
+    if not words:
+        return "?"
+    verb = words[0].upper()
+    upper = [w.upper() for w in words]
+    if verb == "UPDATE" and len(words) > 1:
+        return f"{verb} {words[1]}"
+    for keyword in ("FROM", "INTO"):
+        if keyword in upper and upper.index(keyword) + 1 < len(words):
+            return f"{verb} {words[upper.index(keyword) + 1]}"
+    return verb
+
+
+def init_profiling(app):
+    app.extensions["profiler"] = Profiler(app)
+
+    # Only once profiling is on: with it off, SQL runs without these hooks
+    if not event.contains(Engine, "before_cursor_execute", _before_execute):
+        event.listen(Engine, "before_cursor_execute", _before_execute)
+        event.listen(Engine, "after_cursor_execute", _after_execute)
@@ -0,0 +1,7 @@
+from routes import auth, staff, plans, worksheet, vehicles, admin, closeout
+
+
+def register_blueprints(app):
+    """Registers every route area on the app (URLs are unchanged, no prefixes)."""
+    for module in (auth, staff, plans, worksheet, vehicles, admin, closeout):
+        app.register_blueprint(module.bp)
@@ -0,0 +1,57 @@
+from flask import Blueprint, request, jsonify
+from database import read_replica
+from serialization import rows_to_dicts
+from cache import cache
+from routes.decorators import manager_required
+from datetime import date, timedelta
+
+bp = Blueprint("admin", __name__)
+
+
+# -------------------------------
+# Audit Trail Routes (Manager Only)
+# -------------------------------
+@bp.route('/api/audit', methods=['GET'])
+@manager_required
+@read_replica
+def get_audit_log():
+    """Paginated audit trail, optionally filtered by entity or acting user"""
+    from services.audit_service import AuditService
+
+    return jsonify(AuditService.list_entries(
+        page=request.args.get("page", 1, type=int),
+        per_page=request.args.get("per_page", 50, type=int),
+        entity_type=request.args.get("entity_type"),
+        entity_id=request.args.get("entity_id"),
+        user_id=request.args.get("user_id", type=int)
+    ))
+
+# -------------------------------
+# Report Routes (Manager Only)
+# -------------------------------
+@bp.route('/api/reports/transactions', methods=['GET'])
+@manager_required
+@read_replica
+def report_transactions():
+    """
+    Tickets between start and end (inclusive, YYYY-MM-DD),
+    merged from the live and archive tables.
+    """
+    from services.archive_service import ArchiveService
+
+    try:
+        start = date.fromisoformat(request.args["start"])
+        end = date.fromisoformat(request.args["end"]) + timedelta(days=1)
+    except (KeyError, ValueError):
+        return jsonify({"msg": "start and end dates (YYYY-MM-DD) required"}), 400
+
+    return jsonify(rows_to_dicts(ArchiveService.list_transactions(start, end)))
+
+# -------------------------------
+# Cache Diagnostics (Manager Only)
+# -------------------------------
+@bp.route('/api/cache/stats', methods=['GET'])
+@manager_required
+def get_cache_stats():
+    """Hit/miss counters per cached service method (this worker only)"""
+    return jsonify(cache.get_stats())
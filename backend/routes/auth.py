@@ -0,0 +1,48 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import create_access_token
+from models import User
+
+bp = Blueprint("auth", __name__)
+
+
+# -------------------------------
+# Auth Routes
+# -------------------------------
+@bp.route('/login', methods=['POST'])
+def login():
+    """
+    Authenticates user and returns JWT token.
+
+    JWT Structure:
+    {
+        "sub": "1",           # user_id (string)
+        "role": "Manager",    # stored in additional_claims
+        "exp": ...
+    }
+    """
+
+    data = request.get_json()
+
+    if not data:
+        return jsonify({"msg": "Missing JSON body"}), 400
+
+    # Find user by username
+    user = User.query.filter_by(username=data.get('username')).first()
+
+    # Validate credentials
+    if user and user.check_password(data.get('password')):
+
+        # Create token:
+        # - identity MUST be string (recommended)
+        # - role stored separately in additional_claims
+        access_token = create_access_token(
+            identity=str(user.user_id),  # becomes "sub"
+            additional_claims={
+                "role": user.user_role
+            }
+        )
+
+        return jsonify(access_token=access_token), 200
+
+    # Invalid login
+    return jsonify({"msg": "Invalid credentials"}), 401
@@ -0,0 +1,63 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity
+from database import read_replica
+from services.closeout_service import CloseoutService
+from routes.decorators import manager_required
+from datetime import date
+
+bp = Blueprint("closeout", __name__)
+
+
+# -------------------------------
+# Daily Close-out Routes (Manager Only)
+# -------------------------------
+@bp.route('/api/closeouts', methods=['POST'])
+@manager_required
+def close_day():
+    """Freeze a day's totals (date defaults to today). A day can be closed once."""
+    data = request.get_json(silent=True) or {}
+
+    try:
+        day = date.fromisoformat(data["date"]) if data.get("date") else date.today()
+    except ValueError:
+        return jsonify({"msg": "date must be YYYY-MM-DD"}), 400
+
+    try:
+        closeout = CloseoutService.close_day(day, user_id=int(get_jwt_identity()))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(closeout), 201
+
+@bp.route('/api/closeouts/<day>', methods=['GET'])
+@manager_required
+@read_replica
+def get_closeout(day):
+    """Frozen totals for a closed day, or a live preview of an open one"""
+    try:
+        day = date.fromisoformat(day)
+    except ValueError:
+        return jsonify({"msg": "date must be YYYY-MM-DD"}), 400
+
+    try:
+        closeout = CloseoutService.get_day(day)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(closeout)
+
+@bp.route('/api/reports/closeout', methods=['GET'])
+@manager_required
+@read_replica
+def report_closeout():
+    """
+    Reconciliation totals between start and end (inclusive, YYYY-MM-DD),
+    summed from closed days only. Days not closed yet are listed in open_days.
+    """
+    try:
+        start = date.fromisoformat(request.args["start"])
+        end = date.fromisoformat(request.args["end"])
+    except (KeyError, ValueError):
+        return jsonify({"msg": "start and end dates (YYYY-MM-DD) required"}), 400
+
+    return jsonify(CloseoutService.summary(start, end))
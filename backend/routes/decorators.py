@@ -0,0 +1,46 @@
+from flask import jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from functools import wraps
+
+
+# -------------------------------
+# Robust Manager-Only Decorator
+# -------------------------------
+def manager_required(fn):
+    """
+    Enforces Manager-only access.
+
+    Behavior:
+    - Requires a valid JWT (handled by @jwt_required)
+    - Reads role from top-level JWT claim
+    - Returns 403 if user is not a Manager
+    - Role comparison is case-insensitive
+
+    Place directly under @bp.route so it wraps the view itself.
+    """
+
+    @wraps(fn)
+    @jwt_required()  # Ensures token exists, is valid, and not expired
+    def wrapper(*args, **kwargs):
+
+        # get_jwt() returns the FULL decoded JWT payload
+        # Example:
+        # {
+        #   "sub": "1",
+        #   "role": "Manager",
+        #   "exp": 1234567890,
+        #   ...
+        # }
+        claims = get_jwt()
+
+        # Role is now stored at top-level
+        role = claims.get("role")
+
+        # Check role safely and case-insensitively
+        if not role or role.lower() != "manager":
+            return jsonify({"msg": "Managers only!"}), 403
+
+        # If role is valid → proceed to route
+        return fn(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,99 @@
+from flask import Blueprint, request, jsonify
+from database import read_replica
+from serialization import rows_to_dicts
+from services.client_plan_service import ClientPlanService, ClientPlanVehicleService
+from routes.decorators import manager_required
+import base64
+import csv
+import io
+
+bp = Blueprint("plans", __name__)
+
+
+# -------------------------------
+# Client Plans Routes (Manager Only)
+# -------------------------------
+@bp.route('/api/plans', methods=['GET'])
+@manager_required
+@read_replica
+def get_plans():
+    return jsonify(rows_to_dicts(ClientPlanService.list_plan_rows()))
+
+@bp.route('/api/plans/create', methods=['POST'])
+@manager_required
+def create_plan():
+    data = request.get_json()
+
+    signature_base64 = data.get("signature")
+
+    if not signature_base64:
+        return jsonify({"error": "Signature required"}), 400
+
+    try:
+        signature_bytes = base64.b64decode(signature_base64)
+    except Exception:
+        return jsonify({"error": "Invalid signature format"}), 400
+
+    try:
+        plan = ClientPlanService.create_plan(
+            client_name=data.get("client_name"),
+            billing_cycle=data.get("billing_cycle"),
+            email=data.get("email"),
+            phone=data.get("phone"),
+            signature_bytes=signature_bytes,
+            usage_limit=data.get("usage_limit"),
+            usage_unit=data.get("usage_unit") or "washes"
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"client_plan_id": plan.client_plan_id}), 201
+
+@bp.route('/api/plans/<int:plan_id>/vehicles', methods=['POST'])
+@manager_required
+def add_vehicle_to_plan(plan_id):
+    data = request.get_json()
+    try:
+        link = ClientPlanVehicleService.add_vehicle(
+            plan_id=plan_id,
+            plate=data.get("plate"),
+            category_id=data.get("category_id"),
+            make_model=data.get("make_model")
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"plan_id": link.client_plan_id, "vehicle_id": link.vehicle_id}), 201
+
+@bp.route('/api/plans/<int:plan_id>/vehicles/import', methods=['POST'])
+@manager_required
+def import_plan_vehicles(plan_id):
+    """
+    Bulk fleet onboarding.
+    Accepts a CSV upload ('file' field), a text/csv body, or a JSON list of
+    {plate, category_id, make_model}. CSV columns use the same names.
+    """
+    if "file" in request.files:
+        text = request.files["file"].read().decode("utf-8-sig")
+        rows = list(csv.DictReader(io.StringIO(text)))
+    elif request.mimetype == "text/csv":
+        rows = list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    else:
+        data = request.get_json(silent=True)
+        rows = data.get("vehicles") if isinstance(data, dict) else data
+
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"error": "No vehicles to import"}), 400
+
+    try:
+        report = ClientPlanVehicleService.import_vehicles(plan_id, rows)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    if report is None:
+        return jsonify({"msg": "Plan not found"}), 404
+
+    summary = {}
+    for entry in report:
+        summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+    return jsonify({"summary": summary, "rows": report}), 200
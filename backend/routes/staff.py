@@ -0,0 +1,65 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from database import read_replica
+from serialization import rows_to_dicts
+from services.staff_service import StaffService
+from routes.decorators import manager_required
+
+bp = Blueprint("staff", __name__)
+
+
+# -------------------------------
+# Staff Management Routes (Manager Only)
+# -------------------------------
+@bp.route('/api/staff', methods=['GET'])
+@manager_required
+@read_replica
+def get_staff():
+    """List all staff"""
+    return jsonify(rows_to_dicts(StaffService.list_staff_rows()))
+
+@bp.route('/api/staff/<int:user_id>/toggle', methods=['PATCH'])
+@manager_required
+def toggle_staff_status(user_id):
+    """Activate/deactivate a staff member"""
+    user = StaffService.toggle_status(user_id)
+    if not user:
+        return jsonify({"msg": "User not found"}), 404
+    return jsonify({
+        "user_id": user.user_id,
+        "is_active": user.is_active
+    })
+
+@bp.route('/api/staff/create', methods=['POST'])
+@manager_required
+def create_staff():
+    """Create a new staff user"""
+    data = request.get_json()
+    first_name = data.get("first_name")
+    last_name = data.get("last_name")
+    role = data.get("role")
+    password = data.get("password")
+
+    if not all([first_name, last_name, role, password]):
+        return jsonify({"msg": "All fields required"}), 400
+
+    new_user = StaffService.create_staff(first_name, last_name, role, password)
+    return jsonify({
+        "user_id": new_user.user_id,
+        "full_name": new_user.full_name,
+        "username": new_user.username,
+        "user_role": new_user.user_role,
+        "is_active": new_user.is_active
+    }), 201
+
+# -------------------------------
+# Active Staff (Any Authenticated Staff)
+# -------------------------------
+@bp.route('/api/staff/active', methods=['GET'])
+@jwt_required()
+def get_active_staff():
+    """
+    Returns only active staff.
+    Used by Daily Worksheet.
+    """
+    return jsonify(rows_to_dicts(StaffService.list_active_staff_rows()))
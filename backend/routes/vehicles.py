@@ -0,0 +1,58 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from serialization import rows_to_dicts
+from services.client_plan_service import VehicleCategoryService
+from services.vehicle_service import VehicleService
+
+bp = Blueprint("vehicles", __name__)
+
+
+# -------------------------------
+# Vehicle Routes (Any Authenticated Staff)
+# -------------------------------
+
+# Used by Daily Worksheet and Client Plan Page to see vehicle categories
+@bp.route('/api/vehicle-categories', methods=['GET'])
+@jwt_required()
+def get_vehicle_categories():
+    return jsonify(rows_to_dicts(VehicleCategoryService.list_category_rows()))
+
+@bp.route('/api/vehicles/create', methods=['POST'])
+@jwt_required()
+def create_vehicle():
+
+    data = request.get_json()
+
+    if not data.get("plate") or not data.get("category_id"):
+        return jsonify({"error": "Plate and category required"}), 400
+
+    try:
+        vehicle, created = VehicleService.create_vehicle(
+            plate=data.get("plate"),
+            category_id=data.get("category_id"),
+            make_model=data.get("make_model")
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Registering a plate that's already on file returns that vehicle
+    return jsonify({
+        "vehicle_id": vehicle.vehicle_id,
+        "license_plate": vehicle.license_plate,
+        "vehicle_category_id": vehicle.vehicle_category_id
+    }), 201 if created else 200
+
+@bp.route('/api/vehicles/lookup', methods=['GET'])
+@jwt_required()
+def lookup_vehicle():
+    plate = request.args.get('plate')
+    if not plate:
+        return jsonify({"msg": "Plate required"}), 400
+    
+    # This calls the existing logic in your vehicle_service
+    result = VehicleService.get_vehicle_by_plate(plate)
+    
+    if not result:
+        return jsonify({"msg": "Vehicle not found"}), 404
+        
+    return jsonify(result), 200
@@ -0,0 +1,120 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from database import read_replica
+from services.wash_transaction_service import WashTransactionServiceLayer
+from services.service_service import ServiceService
+from routes.decorators import manager_required
+
+bp = Blueprint("worksheet", __name__)
+
+
+# -------------------------------
+# Daily Worksheet Routes (Any Authenticated Staff)
+# -------------------------------
+@bp.route('/api/worksheet/submit', methods=['POST'])
+@jwt_required()
+def submit_worksheet():
+
+    data = request.get_json()
+    user_id = int(get_jwt_identity())
+
+    # Ensure these keys match exactly what the frontend sends above
+    plate = data.get("plate")  # Must match the new frontend 'plate' key 
+    service_ids = data.get("service_ids", [])
+    employee_ids = data.get("employee_ids", [])
+
+    if not plate:
+        return jsonify({"msg": "Plate required"}), 422
+    if not service_ids or len(service_ids) == 0:
+        return jsonify({"msg": "At least one service required"}), 422
+    if not employee_ids or len(employee_ids) == 0:
+        return jsonify({"msg": "At least one employee required"}), 422
+
+    try:
+        transaction = WashTransactionServiceLayer.create_transaction(
+            plate=data.get("plate"),
+            payment_method=data.get("payment_method"),
+            service_ids=data.get("service_ids", []),
+            employee_ids=data.get("employee_ids", []),
+            discount=data.get("discount"),
+            discount_reason=data.get("discount_reason"),
+            fee=data.get("fee"),
+            fee_reason=data.get("fee_reason"),
+            created_by_user_id=user_id
+        )
+
+        return jsonify({
+            "wash_transaction_id": transaction.wash_transaction_id,
+            "total_price": str(transaction.total_price)
+        }), 201
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@bp.route('/api/worksheet/preview', methods=['POST'])
+@jwt_required()
+def preview_transaction():
+
+    data = request.get_json()
+
+    preview_data = WashTransactionServiceLayer.preview_transaction(
+        plate=data.get("plate"),
+        service_ids=data.get("service_ids", [])
+    )
+
+    return jsonify(preview_data), 200
+
+@bp.route('/api/services/active', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_active_services():
+    return jsonify(ServiceService.list_active_services_with_pricing())
+
+# -------------------------------
+# Corrections (Manager Only)
+# -------------------------------
+@bp.route('/api/worksheet/<int:transaction_id>/void', methods=['POST'])
+@manager_required
+def void_transaction(transaction_id):
+    """Void a committed ticket (appends a reversing entry)"""
+    data = request.get_json(silent=True) or {}
+
+    try:
+        transaction = WashTransactionServiceLayer.void_transaction(
+            transaction_id,
+            reason=data.get("reason"),
+            user_id=int(get_jwt_identity())
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not transaction:
+        return jsonify({"msg": "Transaction not found"}), 404
+    return jsonify({
+        "wash_transaction_id": transaction.wash_transaction_id,
+        "status": transaction.status
+    })
+
+@bp.route('/api/worksheet/<int:transaction_id>/refund', methods=['POST'])
+@manager_required
+def refund_transaction(transaction_id):
+    """Refund part or all of a committed ticket (appends a reversing entry)"""
+    data = request.get_json(silent=True) or {}
+
+    try:
+        transaction = WashTransactionServiceLayer.refund_transaction(
+            transaction_id,
+            amount=data.get("amount"),
+            reason=data.get("reason"),
+            user_id=int(get_jwt_identity())
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not transaction:
+        return jsonify({"msg": "Transaction not found"}), 404
+    return jsonify({
+        "wash_transaction_id": transaction.wash_transaction_id,
+        "status": transaction.status,
+        "refunded_total": WashTransactionServiceLayer.reversed_amount(transaction_id)
+    })
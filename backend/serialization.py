@@ -0,0 +1,89 @@
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+# Optional fast encoder / brotli support; fall back to the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _json_default(obj):
+    """Handles the non-JSON types our rows contain."""
+    if isinstance(obj, Decimal):
+        return str(obj)  # Keep "12.50" exactly as stored
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider used by jsonify().
+
+    - Uses orjson when installed, the json module otherwise
+    - Serializes Decimal as a string and datetime/date as ISO 8601
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            kwargs.setdefault("default", _json_default)
+            kwargs.setdefault("sort_keys", self.sort_keys)
+            return json.dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_json_default, option=option).decode("utf-8")
+
+
+def rows_to_dicts(rows):
+    """Converts column-selected Row tuples into plain dicts for jsonify()."""
+    return [row._asdict() for row in rows]
+
+
+def init_serialization(app):
+    app.json = FastJSONProvider(app)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)  # bytes
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+
+    @app.after_request
+    def compress_response(response):
+        """Compresses large JSON responses with br or gzip, as the client allows."""
+        if (
+            response.direct_passthrough
+            or response.mimetype != "application/json"
+            or not 200 <= response.status_code < 300
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+        encoding = request.accept_encodings.best_match(offered)
+        if encoding == "br":
+            response.set_data(brotli.compress(data))
+        elif encoding == "gzip":
+            response.set_data(gzip.compress(data, compresslevel=app.config['COMPRESS_LEVEL']))
+        else:
+            return response
+
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
@@ -0,0 +1,221 @@
+from models import (
+    WashTransaction,
+    WashTransactionService,
+    WashTransactionEmployee,
+    WashTransactionAdjustment,
+    DailyCloseout,
+    ARCHIVE_TABLES
+)
+from database import db
+from profiling import profiled
+from cache import cache
+from datetime import date, datetime, timedelta
+
+
+class ArchiveService:
+    """
+    Moves closed months of transactions out of the hot tables.
+
+    Responsibilities:
+    - Work out which whole months are older than the retention horizon
+      (and fully closed out: close-outs only read the live tables)
+    - Copy tickets and their child rows into the *_archive tables in batches
+    - Delete the copied rows from the live tables in the same DB transaction
+    - Provide report queries that merge live and archived rows
+
+    Each batch is its own transaction (copy + delete), so a run that stops
+    midway leaves no half-moved tickets. Running it again simply picks up
+    the rows that are still live: the job is resumable by construction.
+    """
+
+    CHILD_MODELS = (WashTransactionService, WashTransactionEmployee, WashTransactionAdjustment)
+
+    @staticmethod
+    def period_of(day):
+        """YYYYMM integer used as archive_period."""
+        return day.year * 100 + day.month
+
+    @staticmethod
+    def archive_cutoff(horizon_days, today=None):
+        """First day of the month containing (today - horizon); everything before it is closed."""
+        today = today or date.today()
+        return (today - timedelta(days=horizon_days)).replace(day=1)
+
+    @staticmethod
+    def pending_periods(cutoff):
+        """
+        Months (first day of each) that still have live tickets before the
+        cutoff. A month is left live until every day its tickets touch has
+        been closed out (see _fully_closed).
+        """
+        periods = []
+        since = date.min
+        while True:
+            oldest = db.session.query(db.func.min(WashTransaction.logged_at)).filter(
+                WashTransaction.logged_at >= since,
+                WashTransaction.logged_at < cutoff
+            ).scalar()
+            if oldest is None:
+                return periods
+
+            # Skip straight to the next month that has tickets
+            month = oldest.date().replace(day=1)
+            if ArchiveService._fully_closed(month):
+                periods.append(month)
+            since = ArchiveService._next_month(month)
+
+    @staticmethod
+    def _fully_closed(month):
+        """
+        True if the days the month's tickets were logged on, and the days any
+        of their voids/refunds were entered on, are all closed out. Archiving
+        sooner would leave those days to be closed with the tickets missing.
+        """
+        start = datetime.combine(month, datetime.min.time())
+        end = datetime.combine(ArchiveService._next_month(month), datetime.min.time())
+        tx = WashTransaction
+        adj = WashTransactionAdjustment
+
+        def not_closed(column):
+            return ~db.exists().where(DailyCloseout.business_date == db.func.date(column))
+
+        open_ticket = db.session.query(tx.wash_transaction_id).filter(
+            tx.logged_at >= start, tx.logged_at < end,
+            not_closed(tx.logged_at)
+        ).first()
+        if open_ticket:
+            return False
+
+        open_adjustment = db.session.query(adj.adjustment_id).join(
+            tx, tx.wash_transaction_id == adj.wash_transaction_id
+        ).filter(
+            tx.logged_at >= start, tx.logged_at < end,
+            not_closed(adj.adjusted_at)
+        ).first()
+        return open_adjustment is None
+
+    @staticmethod
+    def archive_period(month, batch_size=500, dry_run=False):
+        """
+        Archives every ticket logged in `month`, batch_size tickets per
+        transaction. Returns the number of tickets moved (or that would be).
+        """
+        start = datetime.combine(month, datetime.min.time())
+        end = datetime.combine(ArchiveService._next_month(month), datetime.min.time())
+        period = ArchiveService.period_of(month)
+        moved = 0
+
+        if dry_run:
+            return db.session.query(db.func.count(WashTransaction.wash_transaction_id)).filter(
+                WashTransaction.logged_at >= start,
+                WashTransaction.logged_at < end
+            ).scalar()
+
+        ArchiveService._ensure_partition(month)
+
+        while True:
+            ids = [tid for (tid,) in db.session.query(WashTransaction.wash_transaction_id).filter(
+                WashTransaction.logged_at >= start,
+                WashTransaction.logged_at < end
+            ).order_by(WashTransaction.wash_transaction_id).limit(batch_size)]
+            if not ids:
+                break
+
+            try:
+                # Parent first on the way in, children first on the way out (FKs)
+                ArchiveService._copy(WashTransaction, period, ids)
+                for model in ArchiveService.CHILD_MODELS:
+                    ArchiveService._copy(model, period, ids)
+                for model in ArchiveService.CHILD_MODELS + (WashTransaction,):
+                    db.session.execute(
+                        db.delete(model)
+                        .where(model.wash_transaction_id.in_(ids))
+                        .execution_options(synchronize_session=False)
+                    )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                raise e
+
+            moved += len(ids)
+
+        cache.invalidate(*(model.__tablename__ for model in ARCHIVE_TABLES))
+        return moved
+
+    @staticmethod
+    @profiled
+    def list_transactions(start, end):
+        """
+        Tickets logged in [start, end) from both the live and archive tables,
+        oldest first, with an 'archived' flag. Each side is filtered before the
+        UNION ALL so both use their own indexes (and partitions).
+        """
+        live_table = WashTransaction.__table__
+        archive_table = ARCHIVE_TABLES[WashTransaction]
+        columns = [c.name for c in live_table.columns]
+
+        live = db.select(
+            *[live_table.c[name] for name in columns],
+            db.literal(False).label("archived")
+        ).where(
+            live_table.c.logged_at >= start,
+            live_table.c.logged_at < end
+        )
+        archived = db.select(
+            *[archive_table.c[name] for name in columns],
+            db.literal(True).label("archived")
+        ).where(
+            archive_table.c.archive_period.between(ArchiveService.period_of(start), ArchiveService.period_of(end)),
+            archive_table.c.logged_at >= start,
+            archive_table.c.logged_at < end
+        )
+
+        merged = db.union_all(live, archived).subquery()
+        return db.session.execute(
+            db.select(merged).order_by(merged.c.logged_at, merged.c.wash_transaction_id)
+        ).all()
+
+    @staticmethod
+    def _copy(model, period, ids):
+        live_table = model.__table__
+        archive_table = ARCHIVE_TABLES[model]
+        columns = [c.name for c in live_table.columns]
+
+        db.session.execute(
+            archive_table.insert().from_select(
+                ["archive_period"] + columns,
+                db.select(db.literal(period), *[live_table.c[name] for name in columns])
+                .where(live_table.c.wash_transaction_id.in_(ids))
+            )
+        )
+
+    @staticmethod
+    def _ensure_partition(month):
+        """
+        MySQL only: gives `month` its own RANGE partition in every archive
+        table by splitting it off p_future, unless a bounded partition already
+        covers it. ALTER TABLE commits implicitly, so this runs before any batch.
+        """
+        if db.engine.dialect.name != "mysql":
+            return
+
+        period = ArchiveService.period_of(month)
+        upper = ArchiveService.period_of(ArchiveService._next_month(month))
+        for table in ARCHIVE_TABLES.values():
+            bounds = [int(bound) for (bound,) in db.session.execute(db.text(
+                "SELECT PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+                "AND PARTITION_DESCRIPTION <> 'MAXVALUE'"
+            ), {"table": table.name})]
+            if bounds and max(bounds) > period:
+                continue
+            db.session.execute(db.text(
+                f"ALTER TABLE {table.name} REORGANIZE PARTITION p_future INTO ("
+                f"PARTITION p{period} VALUES LESS THAN ({upper}), "
+                f"PARTITION p_future VALUES LESS THAN MAXVALUE)"
+            ))
+        db.session.commit()
+
+    @staticmethod
+    def _next_month(month):
+        return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
@@ -0,0 +1,40 @@
+from models import AuditLog
+from database import db
+from profiling import profiled
+import json
+
+
+class AuditService:
+    """Read-only access to the audit trail"""
+
+    @staticmethod
+    @profiled
+    def list_entries(page=1, per_page=50, entity_type=None, entity_id=None, user_id=None):
+        """
+        Returns one page of audit entries, newest first.
+        Filters are optional and combine with AND.
+        """
+        query = db.select(AuditLog).order_by(AuditLog.audit_id.desc())
+        if entity_type:
+            query = query.filter(AuditLog.entity_type == entity_type)
+        if entity_id is not None:
+            query = query.filter(AuditLog.entity_id == str(entity_id))
+        if user_id is not None:
+            query = query.filter(AuditLog.user_id == user_id)
+
+        result = db.paginate(query, page=page, per_page=per_page, max_per_page=200, error_out=False)
+
+        return {
+            "items": [{
+                "audit_id": a.audit_id,
+                "entity_type": a.entity_type,
+                "entity_id": a.entity_id,
+                "action": a.action,
+                "changes": json.loads(a.changes),
+                "user_id": a.user_id,
+                "logged_at": a.logged_at
+            } for a in result.items],
+            "page": result.page,
+            "per_page": result.per_page,
+            "total": result.total
+        }
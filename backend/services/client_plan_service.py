@@ -1,6 +1,10 @@
 from models import ClientPlan, ClientPlanVehicle, Vehicle, VehicleCategory
 from database import db
+from profiling import profiled
 from datetime import datetime
+from cache import cache
+from services.vehicle_service import VehicleService
+from sqlalchemy.exc import IntegrityError
 
 class ClientPlanService:
     """Handles CRUD operations for Client Plans"""
@@ -9,26 +13,54 @@ class ClientPlanService:
     def list_plans():
         return ClientPlan.query.all()
 
+    @staticmethod
+    @profiled
+    def list_plan_rows():
+        """
+        Column-only rows for the plan list, with each plan's active vehicle
+        count computed in the same query instead of one query per plan.
+        """
+        return db.session.query(
+            ClientPlan.client_plan_id,
+            ClientPlan.client_name,
+            ClientPlan.billing_cycle_type,
+            ClientPlan.contact_email,
+            ClientPlan.contact_phone,
+            ClientPlan.is_active,
+            ClientPlan.usage_limit,
+            ClientPlan.usage_unit,
+            db.func.count(ClientPlanVehicle.vehicle_id).label("vehicle_count")
+        ).outerjoin(
+            ClientPlanVehicle,
+            db.and_(
+                ClientPlanVehicle.client_plan_id == ClientPlan.client_plan_id,
+                ClientPlanVehicle.removed_at.is_(None)
+            )
+        ).group_by(ClientPlan.client_plan_id).all()
+
     @staticmethod
     def get_plan(plan_id):
         return ClientPlan.query.get(plan_id)
 
     @staticmethod
-    def create_plan(client_name, billing_cycle, email, phone, signature_bytes):
+    def create_plan(client_name, billing_cycle, email, phone, signature_bytes, usage_limit=None, usage_unit="washes"):
+        usage_limit, usage_unit = ClientPlanService.validate_usage(usage_limit, usage_unit or "washes")
         plan = ClientPlan(
             client_name=client_name,
             billing_cycle_type=billing_cycle,
             contact_email=email,
             contact_phone=phone,
             client_signature=signature_bytes,
-            is_active=True
+            is_active=True,
+            usage_limit=usage_limit,
+            usage_unit=usage_unit
         )
         db.session.add(plan)
         db.session.commit()
         return plan
 
     @staticmethod
-    def update_plan(plan_id, client_name=None, billing_cycle=None, email=None, phone=None, signature_bytes=None, is_active=None):
+    def update_plan(plan_id, client_name=None, billing_cycle=None, email=None, phone=None, signature_bytes=None, is_active=None, usage_limit=None, usage_unit=None):
         plan = ClientPlan.query.get(plan_id)
         if not plan:
             return None
@@ -44,9 +76,31 @@ class ClientPlanService:
             plan.client_signature = signature_bytes
         if is_active is not None:
             plan.is_active = is_active
+        if usage_limit is not None:
+            plan.usage_limit, _ = ClientPlanService.validate_usage(usage_limit, None)
+        if usage_unit is not None:
+            _, plan.usage_unit = ClientPlanService.validate_usage(None, usage_unit)
         db.session.commit()
         return plan
 
+    @staticmethod
+    def validate_usage(usage_limit, usage_unit):
+        """
+        Checks a plan's quota settings before they reach the DB.
+        usage_limit: None/"" (unlimited) or a whole number >= 0.
+        usage_unit: 'washes', 'services', or None (not being set).
+        """
+        if usage_limit == "":
+            usage_limit = None
+        if usage_limit is not None:
+            if isinstance(usage_limit, str) and usage_limit.strip().isdigit():
+                usage_limit = int(usage_limit)
+            if isinstance(usage_limit, bool) or not isinstance(usage_limit, int) or usage_limit < 0:
+                raise Exception("usage_limit must be a whole number of 0 or more.")
+        if usage_unit is not None and usage_unit not in ("washes", "services"):
+            raise Exception("usage_unit must be 'washes' or 'services'.")
+        return usage_limit, usage_unit
+
     @staticmethod
     def toggle_status(plan_id):
         plan = ClientPlan.query.get(plan_id)
@@ -65,24 +119,188 @@ class ClientPlanVehicleService:
         return plate.replace(" ", "").replace("-", "").upper()
 
     @staticmethod
+    @profiled
     def add_vehicle(plan_id, plate, category_id, make_model=None):
-        normalized = ClientPlanVehicleService.normalize_plate(plate)
-        # Check if vehicle already exists
-        vehicle = Vehicle.query.filter_by(license_plate=normalized).first()
-        if not vehicle:
-            vehicle = Vehicle(
-                license_plate=normalized,
-                vehicle_category_id=category_id,
-                make_model=make_model
-            )
-            db.session.add(vehicle)
+        """
+        Links a vehicle to a plan, registering it first if the plate is new.
+        Re-adding a removed vehicle reactivates its link; an active link is
+        returned as is. Safe when two lanes add the same car at once.
+        """
+        normalized = ClientPlanVehicleService.normalize_plate(plate or "")
+        try:
+            vehicle_id, created = VehicleService.upsert_vehicle(normalized, category_id, make_model)
+
+            link = db.session.get(ClientPlanVehicle, (plan_id, vehicle_id))
+            if link is None:
+                link = ClientPlanVehicle(client_plan_id=plan_id, vehicle_id=vehicle_id)
+                db.session.add(link)
+            elif link.removed_at is not None:
+                link.assigned_at = datetime.utcnow()
+                link.removed_at = None
             db.session.commit()
-        # Link to client plan
-        link = ClientPlanVehicle(client_plan_id=plan_id, vehicle_id=vehicle.vehicle_id)
-        db.session.add(link)
-        db.session.commit()
+        except IntegrityError:
+            # Another request linked the same vehicle first
+            db.session.rollback()
+            link = db.session.get(ClientPlanVehicle, (plan_id, vehicle_id))
+            if link is None:
+                raise Exception("Vehicle could not be linked to this plan.")
+            return link
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+        if created:
+            cache.invalidate("vehicles")
         return link
 
+    @staticmethod
+    @profiled
+    def import_vehicles(plan_id, rows):
+        """
+        Links a whole fleet to a plan in one transaction.
+
+        rows: list of dicts with plate, category_id and optional make_model.
+        Returns a per-row report, or None if the plan doesn't exist.
+
+        Set-based: one IN query for existing vehicles, one for existing links,
+        bulk inserts for missing vehicles and links, a single commit.
+        """
+        import audit  # Optional subsystem; record() is a no-op when it's disabled
+
+        if not db.session.get(ClientPlan, plan_id):
+            return None
+
+        report = []
+        pending = {}  # normalized plate -> row, in file order
+        category_ids = {c for (c,) in db.session.query(VehicleCategory.vehicle_category_id)}
+
+        # 1. Normalize & validate every row before touching the tables
+        for index, row in enumerate(rows, start=1):
+            plate = ClientPlanVehicleService.normalize_plate(str(row.get("plate") or ""))
+            entry = {"row": index, "plate": plate}
+            report.append(entry)
+
+            try:
+                category_id = int(row.get("category_id"))
+            except (TypeError, ValueError):
+                category_id = None
+
+            make_model = row.get("make_model") or None
+            if not plate:
+                entry.update(status="error", message="Plate required")
+            elif len(plate) > Vehicle.license_plate.type.length:
+                entry.update(status="error", message="Plate too long")
+            elif make_model and len(make_model) > Vehicle.make_model.type.length:
+                entry.update(status="error", message="Make/model too long")
+            elif category_id not in category_ids:
+                entry.update(status="error", message="Unknown category")
+            elif plate in pending:
+                entry.update(status="duplicate", message=f"Same plate as row {pending[plate]['entry']['row']}")
+            else:
+                pending[plate] = {
+                    "entry": entry,
+                    "category_id": category_id,
+                    "make_model": make_model
+                }
+
+        if not pending:
+            return report
+
+        try:
+            # 2. Resolve existing vehicles, bulk insert the missing ones
+            vehicle_ids = dict(db.session.query(Vehicle.license_plate, Vehicle.vehicle_id)
+                               .filter(Vehicle.license_plate.in_(pending)))
+            missing = [plate for plate in pending if plate not in vehicle_ids]
+            created = {}
+            if missing:
+                # Plates registered by another request since the lookup are skipped, not an error
+                insert = VehicleService.insert_ignoring_duplicates()
+                values = [{
+                    "license_plate": plate,
+                    "vehicle_category_id": pending[plate]["category_id"],
+                    "make_model": pending[plate]["make_model"]
+                } for plate in missing]
+                if db.engine.dialect.name == "mysql":
+                    db.session.execute(insert, values)
+                    # A plain read uses the snapshot the lookup above started (REPEATABLE
+                    # READ): it sees the rows this INSERT added, but not plates another
+                    # request committed since, so it returns exactly the ones we created
+                    created = dict(db.session.query(Vehicle.license_plate, Vehicle.vehicle_id)
+                                   .filter(Vehicle.license_plate.in_(missing)))
+                else:
+                    created = dict(db.session.execute(
+                        insert.returning(Vehicle.license_plate, Vehicle.vehicle_id), values
+                    ).all())
+                vehicle_ids.update(created)
+
+                # Locking read: sees the rows the other requests committed
+                taken = [plate for plate in missing if plate not in created]
+                if taken:
+                    vehicle_ids.update(db.session.query(Vehicle.license_plate, Vehicle.vehicle_id)
+                                       .filter(Vehicle.license_plate.in_(taken))
+                                       .with_for_update(read=True))
+                for plate, vehicle_id in created.items():
+                    audit.record(db.session, "vehicles", vehicle_id, "insert", {
+                        "license_plate": [None, plate],
+                        "vehicle_category_id": [None, pending[plate]["category_id"]]
+                    })
+
+            # 3. Skip active links, reactivate removed ones, insert the rest
+            links = {link.vehicle_id: link for link in db.session.query(
+                ClientPlanVehicle.vehicle_id, ClientPlanVehicle.assigned_at, ClientPlanVehicle.removed_at
+            ).filter(
+                ClientPlanVehicle.client_plan_id == plan_id,
+                ClientPlanVehicle.vehicle_id.in_(vehicle_ids.values())
+            )}
+
+            new_links, relinks = [], []
+            for plate, item in pending.items():
+                vehicle_id = vehicle_ids[plate]
+                entry = item["entry"]
+                entry["vehicle_id"] = vehicle_id
+                if vehicle_id not in links:
+                    new_links.append({"client_plan_id": plan_id, "vehicle_id": vehicle_id})
+                    entry["status"] = "created" if plate in created else "linked"
+                elif links[vehicle_id].removed_at is not None:
+                    relinks.append(vehicle_id)
+                    entry["status"] = "relinked"
+                else:
+                    entry["status"] = "already_linked"
+
+            now = datetime.utcnow()
+            if new_links:
+                db.session.execute(db.insert(ClientPlanVehicle), [
+                    {**link, "assigned_at": now} for link in new_links
+                ])
+            if relinks:
+                db.session.execute(
+                    db.update(ClientPlanVehicle)
+                    .where(
+                        ClientPlanVehicle.client_plan_id == plan_id,
+                        ClientPlanVehicle.vehicle_id.in_(relinks)
+                    )
+                    .values(assigned_at=now, removed_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+            for link in new_links:
+                audit.record(db.session, "client_plan_vehicles", f"{plan_id}:{link['vehicle_id']}", "insert", {
+                    "assigned_at": [None, now]
+                })
+            for vehicle_id in relinks:
+                audit.record(db.session, "client_plan_vehicles", f"{plan_id}:{vehicle_id}", "update", {
+                    "assigned_at": [links[vehicle_id].assigned_at, now],
+                    "removed_at": [links[vehicle_id].removed_at, None]
+                })
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+        # Bulk statements skip the flush, so invalidate their tables explicitly
+        cache.invalidate("vehicles", "client_plan_vehicles")
+        return report
+
     @staticmethod
     def list_vehicles(plan_id):
         return ClientPlanVehicle.query.filter_by(client_plan_id=plan_id, removed_at=None).all()
@@ -99,4 +317,12 @@ class VehicleCategoryService:
 
     @staticmethod
     def list_categories():
-        return VehicleCategory.query.order_by(VehicleCategory.category_name).all()
\ No newline at end of file
+        return VehicleCategory.query.order_by(VehicleCategory.category_name).all()
+
+    @staticmethod
+    @cache.cached(tags=("vehicle_categories",))
+    def list_category_rows():
+        return db.session.query(
+            VehicleCategory.vehicle_category_id,
+            VehicleCategory.category_name
+        ).order_by(VehicleCategory.category_name).all()
\ No newline at end of file
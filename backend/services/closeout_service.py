@@ -0,0 +1,311 @@
+from models import (
+    WashTransaction,
+    WashTransactionEmployee,
+    WashTransactionAdjustment,
+    DailyCloseout,
+    DailyCloseoutLine,
+    REVERSAL_TYPES,
+    ARCHIVE_TABLES
+)
+from database import db
+from services.archive_service import ArchiveService
+from profiling import profiled
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+
+class CloseoutService:
+    """
+    End-of-day cash/card reconciliation.
+
+    Responsibilities:
+    - Aggregate one day's tickets, adjustments and staff counts in a single statement
+    - Freeze the result as a daily_closeouts record (never updated afterwards)
+    - Refuse new tickets and reversals dated into a closed day (checked in
+      the write's own transaction, so none can slip in while a day closes)
+    - Serve reports for closed days from the frozen rows only
+
+    A day's tickets are those logged that day; voids/refunds count on the day
+    they were entered (adjusted_at), not the day of the original ticket, so a
+    closed day's numbers never change.
+    """
+
+    LINE_TYPES = ("payment", "reversal", "adjustment", "employee")
+
+    # -----------------------------
+    # Closed-day Guard
+    # -----------------------------
+    @staticmethod
+    def ensure_open(day=None):
+        """
+        Raises if `day` (default today) has been closed out.
+
+        Call inside the write's own transaction. The locking read holds the
+        day's key until that transaction commits, so close_day's claim on the
+        day waits for it and its totals include this write.
+        """
+        day = day or date.today()
+        closed = db.session.query(DailyCloseout.business_date).filter(
+            DailyCloseout.business_date == day
+        ).with_for_update(read=True).first()
+        if closed:
+            raise Exception(f"{day.isoformat()} is already closed out.")
+
+    # -----------------------------
+    # Aggregation
+    # -----------------------------
+    @staticmethod
+    def aggregate(day):
+        """
+        (line_type, line_key, line_count, line_amount) rows for `day`.
+        One UNION ALL of four GROUP BYs, each bounded by the day's range.
+        """
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+        tx = WashTransaction
+        adj = WashTransactionAdjustment
+        key_type = db.String(120)
+
+        payments = db.select(
+            db.literal("payment").label("line_type"),
+            db.cast(tx.payment_method, key_type).label("line_key"),
+            db.func.count().label("line_count"),
+            db.func.sum(tx.total_price).label("line_amount")
+        ).where(
+            tx.logged_at >= start, tx.logged_at < end
+        ).group_by(tx.payment_method)
+
+        reversals = db.select(
+            db.literal("reversal"),
+            db.cast(tx.payment_method, key_type),
+            db.func.count(),
+            db.func.sum(adj.adjustment_amount)
+        ).join(
+            tx, tx.wash_transaction_id == adj.wash_transaction_id
+        ).where(
+            adj.adjusted_at >= start, adj.adjusted_at < end,
+            adj.adjustment_type.in_(REVERSAL_TYPES)
+        ).group_by(tx.payment_method)
+
+        adjustment_key = db.cast(adj.adjustment_type, key_type) + ":" + db.func.coalesce(adj.adjustment_reason, "")
+        adjustments = db.select(
+            db.literal("adjustment"),
+            adjustment_key,
+            db.func.count(),
+            db.func.sum(adj.adjustment_amount)
+        ).where(
+            adj.adjusted_at >= start, adj.adjusted_at < end
+        ).group_by(adjustment_key)  # No reason and an empty reason share a key, so one line
+
+        employees = db.select(
+            db.literal("employee"),
+            db.cast(WashTransactionEmployee.user_id, key_type),
+            db.func.count(),
+            db.literal(0)
+        ).join(
+            tx, tx.wash_transaction_id == WashTransactionEmployee.wash_transaction_id
+        ).where(
+            tx.logged_at >= start, tx.logged_at < end
+        ).group_by(WashTransactionEmployee.user_id)
+
+        return db.session.execute(db.union_all(payments, reversals, adjustments, employees)).all()
+
+    @staticmethod
+    def _ensure_live(day):
+        """
+        Raises if any of the day's tickets or reversals were already moved to
+        the archive tables. aggregate() reads the live tables only, so such a
+        day would be previewed (or frozen) with those rows missing.
+        """
+        tx_archive = ARCHIVE_TABLES[WashTransaction]
+        adj_archive = ARCHIVE_TABLES[WashTransactionAdjustment]
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+        period = ArchiveService.period_of(day)
+
+        archived = db.session.execute(db.select(
+            db.exists().where(
+                tx_archive.c.archive_period == period,
+                tx_archive.c.logged_at >= start, tx_archive.c.logged_at < end
+            ) | db.exists().where(
+                adj_archive.c.archive_period <= period,
+                adj_archive.c.adjusted_at >= start, adj_archive.c.adjusted_at < end
+            )
+        )).scalar()
+        if archived:
+            raise Exception(f"{day.isoformat()} has archived transactions and can no longer be closed out.")
+
+    # -----------------------------
+    # Close-out
+    # -----------------------------
+    @staticmethod
+    @profiled
+    def close_day(day, user_id=None):
+        """
+        Computes and freezes `day`. Each day can be closed exactly once.
+
+        The day is claimed first by inserting its daily_closeouts row. That
+        insert waits for tickets/reversals that already passed ensure_open to
+        commit, and later ones see the row and are refused, so the aggregate
+        that follows misses nothing. (On MySQL this relies on the claim being
+        the first statement of the transaction, so the aggregate's snapshot
+        is taken after it.) The totals are filled into the claimed row before
+        anyone else can see it.
+        """
+        if day > date.today():
+            raise Exception("Cannot close out a future day.")
+
+        closed_at = datetime.now()
+        try:
+            db.session.execute(db.insert(DailyCloseout).values(
+                business_date=day,
+                transaction_count=0,
+                gross_total=0,
+                reversed_total=0,
+                net_total=0,
+                closed_by_user_id=user_id,
+                closed_at=closed_at
+            ))
+        except IntegrityError:
+            # Already closed (possibly by another manager a moment ago)
+            db.session.rollback()
+            raise Exception(f"{day.isoformat()} is already closed out.")
+
+        try:
+            CloseoutService._ensure_live(day)
+            rows = CloseoutService.aggregate(day)
+            gross = sum((Decimal(str(r.line_amount or 0)) for r in rows if r.line_type == "payment"), Decimal("0.00"))
+            reversed_total = sum((Decimal(str(r.line_amount or 0)) for r in rows if r.line_type == "reversal"), Decimal("0.00"))
+            totals = {
+                "transaction_count": sum(r.line_count for r in rows if r.line_type == "payment"),
+                "gross_total": gross,
+                "reversed_total": reversed_total,
+                "net_total": gross - reversed_total
+            }
+
+            # Core statements: the row is still ours, so the frozen-row guard doesn't apply
+            db.session.execute(
+                db.update(DailyCloseout)
+                .where(DailyCloseout.business_date == day)
+                .values(**totals)
+                .execution_options(synchronize_session=False)
+            )
+            if rows:
+                db.session.execute(db.insert(DailyCloseoutLine), [{
+                    "business_date": day,
+                    "line_type": r.line_type,
+                    "line_key": r.line_key,
+                    "line_count": r.line_count,
+                    "line_amount": Decimal(str(r.line_amount or 0))
+                } for r in rows])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+        # Built from the values in hand; nothing is reloaded after the commit
+        result = {"business_date": day, "closed": True}
+        result.update(totals)
+        result.update({"closed_by_user_id": user_id, "closed_at": closed_at})
+        result.update(CloseoutService._group_lines(rows))
+        return result
+
+    # -----------------------------
+    # Reports
+    # -----------------------------
+    @staticmethod
+    def get_day(day):
+        """Frozen record for a closed day, or a live (unsaved) preview of an open one."""
+        closeout = db.session.get(DailyCloseout, day)
+        if closeout:
+            lines = DailyCloseoutLine.query.filter_by(business_date=day).all()
+            return CloseoutService._to_dict(closeout, lines)
+
+        CloseoutService._ensure_live(day)
+        preview = {"business_date": day, "closed": False}
+        preview.update(CloseoutService._group_lines(CloseoutService.aggregate(day)))
+        return preview
+
+    @staticmethod
+    @profiled
+    def summary(start, end):
+        """
+        Totals for closed days in [start, end], read only from the frozen rows.
+        Days in the range that are not closed yet are listed in open_days.
+        """
+        headers = DailyCloseout.query.filter(
+            DailyCloseout.business_date.between(start, end)
+        ).order_by(DailyCloseout.business_date).all()
+
+        lines = db.session.query(
+            DailyCloseoutLine.line_type,
+            DailyCloseoutLine.line_key,
+            db.func.sum(DailyCloseoutLine.line_count).label("line_count"),
+            db.func.sum(DailyCloseoutLine.line_amount).label("line_amount")
+        ).filter(
+            DailyCloseoutLine.business_date.between(start, end)
+        ).group_by(DailyCloseoutLine.line_type, DailyCloseoutLine.line_key).all()
+
+        closed = {h.business_date for h in headers}
+        last = min(end, date.today())
+        open_days = [
+            start + timedelta(days=i)
+            for i in range((last - start).days + 1)
+            if start + timedelta(days=i) not in closed
+        ]
+
+        result = {
+            "start": start,
+            "end": end,
+            "days": [CloseoutService._header(h) for h in headers],
+            "open_days": open_days,
+            "transaction_count": sum(h.transaction_count for h in headers),
+            "gross_total": sum((h.gross_total for h in headers), Decimal("0.00")),
+            "reversed_total": sum((h.reversed_total for h in headers), Decimal("0.00")),
+            "net_total": sum((h.net_total for h in headers), Decimal("0.00"))
+        }
+        result.update(CloseoutService._group_lines(lines))
+        return result
+
+    @staticmethod
+    def _header(closeout):
+        return {
+            "business_date": closeout.business_date,
+            "closed": True,
+            "transaction_count": closeout.transaction_count,
+            "gross_total": closeout.gross_total,
+            "reversed_total": closeout.reversed_total,
+            "net_total": closeout.net_total,
+            "closed_by_user_id": closeout.closed_by_user_id,
+            "closed_at": closeout.closed_at
+        }
+
+    @staticmethod
+    def _to_dict(closeout, lines):
+        result = CloseoutService._header(closeout)
+        result.update(CloseoutService._group_lines(lines))
+        return result
+
+    @staticmethod
+    def _group_lines(lines):
+        """{"payment": {"cash": {"count": 3, "amount": "30.00"}}, "reversal": {...}, ...}"""
+        grouped = {line_type: {} for line_type in CloseoutService.LINE_TYPES}
+        for line in lines:
+            grouped[line.line_type][line.line_key] = {
+                "count": int(line.line_count),
+                "amount": Decimal(str(line.line_amount or 0)).quantize(Decimal("0.01"))
+            }
+        return grouped
+
+
+# -----------------------------
+# Immutability
+# -----------------------------
+@event.listens_for(DailyCloseout, "before_update")
+@event.listens_for(DailyCloseout, "before_delete")
+@event.listens_for(DailyCloseoutLine, "before_update")
+@event.listens_for(DailyCloseoutLine, "before_delete")
+def _refuse_changes(mapper, connection, target):
+    raise Exception("Close-out records are frozen and cannot be changed.")
@@ -0,0 +1,121 @@
+from models import ClientPlanUsage
+from database import db
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from datetime import date, timedelta
+
+
+class PlanQuotaService:
+    """
+    Enforces per-plan usage limits.
+
+    Responsibilities:
+    - Resolve the current billing cycle (weekly = Monday, monthly = 1st)
+    - Count usage in washes or services, depending on the plan
+    - Consume quota with an atomic conditional UPDATE (no COUNT(*) scans)
+    - Report remaining quota for previews
+    """
+
+    @staticmethod
+    def cycle_start(billing_cycle_type, on_date=None):
+        on_date = on_date or date.today()
+        if billing_cycle_type == "weekly":
+            return on_date - timedelta(days=on_date.weekday())
+        return on_date.replace(day=1)
+
+    @staticmethod
+    def units_for(plan, service_ids):
+        # 'services' plans are charged per service, 'washes' plans per ticket
+        if plan.usage_unit == "services":
+            return len(service_ids)
+        return 1
+
+    @staticmethod
+    def get_remaining(plan):
+        """Returns remaining units for the current cycle, or None if unlimited."""
+        if plan.usage_limit is None:
+            return None
+
+        usage = db.session.get(
+            ClientPlanUsage,
+            (plan.client_plan_id, PlanQuotaService.cycle_start(plan.billing_cycle_type))
+        )
+        used = usage.used_count if usage else 0
+        return max(plan.usage_limit - used, 0)
+
+    @staticmethod
+    def consume(plan, units):
+        """
+        Atomically adds `units` to the plan's counter for the current cycle.
+
+        The UPDATE only matches while used_count + units <= usage_limit, so two
+        lanes racing for the last wash cannot both succeed. Must run inside the
+        caller's transaction; the row lock is held until it commits.
+        """
+        if plan.usage_limit is None:
+            return None
+
+        cycle = PlanQuotaService.cycle_start(plan.billing_cycle_type)
+
+        # Counter row first, so the UPDATE always has a row to lock
+        PlanQuotaService._ensure_counter(plan.client_plan_id, cycle)
+        if not PlanQuotaService._increment(plan, cycle, units):
+            raise Exception("Plan quota exceeded for this billing cycle.")
+
+        return True
+
+    @staticmethod
+    def release(plan, units, on_date):
+        """
+        Gives back quota when a plan ticket is voided or refunded.
+        Only the cycle the ticket was logged in is credited, never below zero.
+        """
+        if plan.usage_limit is None:
+            return
+
+        db.session.execute(
+            db.update(ClientPlanUsage)
+            .where(
+                ClientPlanUsage.client_plan_id == plan.client_plan_id,
+                ClientPlanUsage.cycle_start == PlanQuotaService.cycle_start(plan.billing_cycle_type, on_date),
+                ClientPlanUsage.used_count >= units
+            )
+            .values(used_count=ClientPlanUsage.used_count - units)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _increment(plan, cycle, units):
+        result = db.session.execute(
+            db.update(ClientPlanUsage)
+            .where(
+                ClientPlanUsage.client_plan_id == plan.client_plan_id,
+                ClientPlanUsage.cycle_start == cycle,
+                ClientPlanUsage.used_count + units <= plan.usage_limit
+            )
+            .values(used_count=ClientPlanUsage.used_count + units)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def _ensure_counter(plan_id, cycle):
+        """
+        Creates the cycle's counter row if it's missing, in one statement.
+
+        Running an UPDATE against a missing row and then INSERTing would let
+        two lanes both take a gap lock and deadlock on the insert (InnoDB
+        rolls back the whole ticket for that). On MySQL the no-op ON DUPLICATE
+        KEY UPDATE locks an existing row exclusively right away; INSERT IGNORE
+        would take a shared lock that both lanes then try to upgrade.
+        """
+        table = ClientPlanUsage.__table__
+        values = {"client_plan_id": plan_id, "cycle_start": cycle, "used_count": 0}
+        dialect = db.engine.dialect.name
+        if dialect == "mysql":
+            statement = mysql.insert(table).values(**values).on_duplicate_key_update(used_count=table.c.used_count)
+        else:
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = insert(table).values(**values).on_conflict_do_nothing(
+                index_elements=["client_plan_id", "cycle_start"]
+            )
+        db.session.execute(statement)
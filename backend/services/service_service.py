@@ -1,5 +1,6 @@
 from models import Service, VehicleCategory, ServicePricing
 from database import db
+from cache import cache
 
 class ServiceService:
     @staticmethod
@@ -10,6 +11,40 @@ class ServiceService:
     def list_active_services():
         return Service.query.filter_by(is_active=True).all()
 
+    @staticmethod
+    @cache.cached(tags=("services", "service_pricing"))
+    def list_active_services_with_pricing():
+        """
+        Active services with their full pricing matrix, built from two
+        column-only queries (services, then all their prices in one IN).
+        """
+        services = db.session.query(
+            Service.service_id,
+            Service.service_name,
+            Service.service_description
+        ).filter(Service.is_active == True).all()
+
+        pricing_by_service = {s.service_id: [] for s in services}
+        if pricing_by_service:
+            pricing_rows = db.session.query(
+                ServicePricing.service_id,
+                ServicePricing.vehicle_category_id,
+                ServicePricing.base_price
+            ).filter(ServicePricing.service_id.in_(pricing_by_service)).all()
+
+            for p in pricing_rows:
+                pricing_by_service[p.service_id].append({
+                    "vehicle_category_id": p.vehicle_category_id,
+                    "base_price": p.base_price  # Serialized as a string by the JSON provider
+                })
+
+        return [{
+            "service_id": s.service_id,
+            "service_name": s.service_name,
+            "service_description": s.service_description,
+            "pricing": pricing_by_service[s.service_id]
+        } for s in services]
+
     @staticmethod
     def get_service(service_id):
         return Service.query.get(service_id)
@@ -1,5 +1,6 @@
 from models import User
 from database import db
+from cache import cache
 
 class StaffService:
     """Handles all Staff CRUD operations"""
@@ -8,6 +9,17 @@ class StaffService:
     def list_staff():
         return User.query.all()
 
+    @staticmethod
+    def list_staff_rows():
+        """Column-only rows for the staff list (no ORM hydration)."""
+        return db.session.query(
+            User.user_id,
+            User.full_name,
+            User.username,
+            User.user_role,
+            User.is_active
+        ).all()
+
     @staticmethod
     def toggle_status(user_id):
         user = User.query.get(user_id)
@@ -33,4 +45,34 @@ class StaffService:
         Returns only active staff members.
         Used by Daily Worksheet.
         """
-        return User.query.filter_by(is_active=True).all()
\ No newline at end of file
+        return User.query.filter_by(is_active=True).all()
+
+    @staticmethod
+    @cache.cached(tags=("users",))
+    def list_active_staff_rows():
+        """Column-only rows of active staff for the Daily Worksheet."""
+        return db.session.query(
+            User.user_id,
+            User.full_name,
+            User.username,
+            User.user_role
+        ).filter(User.is_active == True).all()
+
+    @staticmethod
+    @cache.cached(tags=("users",))
+    def active_staff_ids():
+        """
+        Set of active user IDs, for validating worksheet assignments.
+        Held in the result cache; the commits in toggle_status/create_staff
+        touch the users table, which drops it automatically. Only current on
+        every worker with the shared (redis) cache backend.
+        """
+        return frozenset(row.user_id for row in StaffService.list_active_staff_rows())
+
+    @staticmethod
+    def active_ids_among(user_ids):
+        """Which of `user_ids` are active staff, read from the DB (one query)."""
+        return {uid for (uid,) in db.session.query(User.user_id).filter(
+            User.user_id.in_(user_ids),
+            User.is_active == True
+        )}
\ No newline at end of file
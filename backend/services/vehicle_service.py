@@ -1,5 +1,7 @@
 from models import Vehicle, ClientPlan, ClientPlanVehicle, VehicleCategory
 from database import db
+from cache import cache
+from sqlalchemy.dialects import postgresql, sqlite
 
 class VehicleService:
 
@@ -54,23 +56,81 @@ class VehicleService:
     
     @staticmethod
     def create_vehicle(plate, make_model, category_id):
-            """
-            Creates a new vehicle record in the database.
-            
-            :param plate: Normalized license plate string
-            :param make_model: String describing the vehicle's make and model
-            :param category_id: Integer ID of the vehicle category
-            :return: The newly created Vehicle object
-            """
-            # Create the new vehicle instance
-            new_vehicle = Vehicle(
-                license_plate=plate,
-                make_model=make_model,
-                vehicle_category_id=category_id
-            )
-            
-            # Add to session and commit to the database
-            db.session.add(new_vehicle)
+        """
+        Registers a vehicle, or returns the one already on file for the plate.
+        Safe when two lanes register the same car at once (see upsert_vehicle).
+
+        :return: (Vehicle, created)
+        """
+        normalized = VehicleService.normalize_plate(plate)
+        try:
+            vehicle_id, created = VehicleService.upsert_vehicle(normalized, category_id, make_model)
             db.session.commit()
-            
-            return new_vehicle   
\ No newline at end of file
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+        # Core INSERT skips the flush, so invalidate explicitly
+        if created:
+            cache.invalidate("vehicles")
+        return db.session.get(Vehicle, vehicle_id), created
+
+    @staticmethod
+    def upsert_vehicle(plate, category_id, make_model=None):
+        """
+        Inserts a vehicle unless its (normalized) plate is already on file.
+        Returns (vehicle_id, created); an existing vehicle is left as it is.
+
+        One atomic statement, so concurrent registrations can't both insert
+        or fail on the unique plate: INSERT IGNORE on MySQL, INSERT ... ON
+        CONFLICT DO NOTHING RETURNING on SQLite/PostgreSQL. Only when the plate
+        already exists does a second query read its id.
+
+        Runs in the caller's transaction; the caller commits.
+        """
+        import audit  # Optional subsystem; record() is a no-op when it's disabled
+        from services.client_plan_service import VehicleCategoryService
+
+        # Validated up front: INSERT IGNORE would turn these errors into warnings
+        if not plate or len(plate) > Vehicle.license_plate.type.length:
+            raise Exception("Invalid license plate.")
+        if make_model and len(make_model) > Vehicle.make_model.type.length:
+            raise Exception("Make/model is too long.")
+        try:
+            category_id = int(category_id)
+        except (TypeError, ValueError):
+            category_id = None
+        if category_id not in {row.vehicle_category_id for row in VehicleCategoryService.list_category_rows()}:
+            raise Exception("Unknown vehicle category.")
+
+        values = {"license_plate": plate, "vehicle_category_id": category_id, "make_model": make_model or None}
+        insert = VehicleService.insert_ignoring_duplicates()
+        if db.engine.dialect.name == "mysql":
+            result = db.session.execute(insert.values(**values))
+            vehicle_id = result.lastrowid if result.rowcount == 1 else None
+        else:
+            vehicle_id = db.session.execute(insert.values(**values).returning(Vehicle.vehicle_id)).scalar()
+
+        if vehicle_id is not None:
+            audit.record(db.session, "vehicles", vehicle_id, "insert", {
+                "license_plate": [None, plate],
+                "vehicle_category_id": [None, category_id]
+            })
+            return vehicle_id, True
+
+        # Locking read: sees a row committed by another lane after our snapshot began
+        vehicle_id = db.session.query(Vehicle.vehicle_id).filter(
+            Vehicle.license_plate == plate
+        ).with_for_update(read=True).scalar()
+        if vehicle_id is None:
+            raise Exception("Vehicle could not be saved.")
+        return vehicle_id, False
+
+    @staticmethod
+    def insert_ignoring_duplicates():
+        """INSERT into vehicles that skips plates already on file instead of failing."""
+        dialect = db.engine.dialect.name
+        if dialect == "mysql":
+            return db.insert(Vehicle).prefix_with("IGNORE")
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        return insert(Vehicle).on_conflict_do_nothing(index_elements=["license_plate"])
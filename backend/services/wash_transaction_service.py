@@ -8,10 +8,16 @@ from models import (
     ServicePricing,
     ClientPlanVehicle,
     ClientPlan,
-    User
+    User,
+    REVERSAL_TYPES
 )
 from database import db
-from decimal import Decimal
+from profiling import profiled
+from cache import cache
+from services.staff_service import StaffService
+from services.closeout_service import CloseoutService
+from decimal import Decimal, InvalidOperation
+from services.plan_quota_service import PlanQuotaService
 
 
 class WashTransactionServiceLayer:
@@ -21,14 +27,17 @@ class WashTransactionServiceLayer:
     Responsibilities:
     - Normalize and validate vehicle
     - Detect active membership plans
+    - Enforce plan usage quotas
     - Calculate service pricing
     - Apply discounts/fees
     - Attach employees
     - Maintain pricing snapshots
     - Commit atomic transaction
+    - Void/refund by appending reversing adjustments (history is never edited)
     """
 
     @staticmethod
+    @profiled
     def create_transaction(
         plate,
         payment_method,
@@ -44,6 +53,12 @@ class WashTransactionServiceLayer:
         # FIX: Force casting to prevent "string vs int" database errors
         service_ids = [int(sid) for sid in service_ids]
         employee_ids = [int(eid) for eid in employee_ids]
+
+        # Checked before anything is written, so bad input never builds a
+        # ticket only to roll it back
+        WashTransactionServiceLayer.validate_employees(employee_ids)
+        employee_ids = list(dict.fromkeys(employee_ids))
+        CloseoutService.ensure_open()
         
         # -----------------------------
         # 1. Normalize License Plate & Fetch Vehicle
@@ -80,6 +95,9 @@ class WashTransactionServiceLayer:
                 payment_method = "plan"
                 client_plan_id = plan.client_plan_id
 
+                # Consume quota up front; raises if this cycle's limit is reached
+                PlanQuotaService.consume(plan, PlanQuotaService.units_for(plan, service_ids))
+
         # -----------------------------
         # 4. Create Base Transaction Record
         # -----------------------------
@@ -161,11 +179,13 @@ class WashTransactionServiceLayer:
 
 
     @staticmethod
+    @profiled
     def preview_transaction(plate, service_ids, discount=0, fee=0):
         """
         Calculates the real-time price preview.
             - Normalizes the plate and fetches the vehicle
             - Detects active membership plans (for UI hints)
+            - Reports remaining plan quota for the current billing cycle
             - Calculates base prices for selected services
             - Applies discounts and fees to the preview total
             - Returns structured data for frontend display
@@ -179,6 +199,9 @@ class WashTransactionServiceLayer:
         # 1. Plan detection (For UI to set payment_method to 'plan')
         plan_active = False
         client_plan_id = None
+        quota_limit = None
+        quota_unit = None
+        quota_remaining = None
         plan_link = ClientPlanVehicle.query.filter_by(
             vehicle_id=vehicle.vehicle_id,
             removed_at=None
@@ -189,6 +212,9 @@ class WashTransactionServiceLayer:
             if plan and plan.is_active:
                 plan_active = True
                 client_plan_id = plan.client_plan_id
+                quota_limit = plan.usage_limit
+                quota_unit = plan.usage_unit
+                quota_remaining = PlanQuotaService.get_remaining(plan)
 
         # 2. Calculate Base Prices for Services
         total = Decimal("0.00")
@@ -223,6 +249,143 @@ class WashTransactionServiceLayer:
             "vehicle_category_id": vehicle.vehicle_category_id,
             "plan_active": plan_active,
             "client_plan_id": client_plan_id,
+            "quota_limit": quota_limit,
+            "quota_unit": quota_unit,
+            "quota_remaining": quota_remaining,
             "services": services_preview,
             "total": float(max(total, Decimal("0.00")))
-        }
\ No newline at end of file
+        }
+
+
+    @staticmethod
+    def validate_employees(employee_ids):
+        """
+        Rejects assignments to unknown or inactive staff.
+
+        With the shared cache, roster changes reach every worker, so IDs found
+        in the cached roster cost no query; only misses (e.g. staff created a
+        moment ago) are re-checked against the DB. A per-process cache can't
+        see another worker's deactivation, so then every ID is checked in one
+        query.
+        """
+        if not employee_ids:
+            raise Exception("At least one employee required.")
+
+        invalid = set(employee_ids)
+        if cache.is_shared():
+            invalid -= StaffService.active_staff_ids()
+        if invalid:
+            invalid -= StaffService.active_ids_among(invalid)
+
+        invalid = sorted(invalid)
+        if invalid:
+            raise Exception(f"Unknown or inactive employee IDs: {', '.join(str(eid) for eid in invalid)}")
+
+
+    @staticmethod
+    @profiled
+    def void_transaction(transaction_id, reason=None, user_id=None):
+        """
+        Voids a ticket by appending a 'void' adjustment for what is left of
+        its total after any partial refunds. The original rows are left
+        untouched; plan quota is given back.
+        """
+        # The reversing entry is dated today, so today must still be open
+        CloseoutService.ensure_open()
+        transaction = db.session.get(WashTransaction, transaction_id, with_for_update=True)
+        if not transaction:
+            return None
+        if transaction.status != "completed":
+            raise Exception("Only completed transactions can be voided.")
+
+        db.session.add(WashTransactionAdjustment(
+            wash_transaction_id=transaction.wash_transaction_id,
+            adjustment_type="void",
+            adjustment_amount=transaction.total_price - WashTransactionServiceLayer.reversed_amount(transaction_id),
+            adjustment_reason=reason,
+            created_by_user_id=user_id
+        ))
+        transaction.status = "voided"
+        WashTransactionServiceLayer._release_plan_quota(transaction)
+
+        try:
+            db.session.commit()
+            return transaction
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    @profiled
+    def refund_transaction(transaction_id, amount=None, reason=None, user_id=None):
+        """
+        Refunds part or all of a ticket by appending a 'refund' adjustment.
+        amount=None refunds the remaining balance. The ticket only becomes
+        'refunded' once nothing is left; after a partial refund it stays
+        'completed' and can still be refunded further or voided.
+        """
+        if amount is not None:
+            try:
+                amount = Decimal(str(amount)).quantize(Decimal("0.01"))
+            except InvalidOperation:
+                raise Exception("Refund amount must be a number.")
+            if not amount.is_finite():
+                raise Exception("Refund amount must be a number.")
+
+        # The reversing entry is dated today, so today must still be open
+        CloseoutService.ensure_open()
+        transaction = db.session.get(WashTransaction, transaction_id, with_for_update=True)
+        if not transaction:
+            return None
+        if transaction.status == "voided":
+            raise Exception("Voided transactions cannot be refunded.")
+
+        remaining = transaction.total_price - WashTransactionServiceLayer.reversed_amount(transaction_id)
+        amount = remaining if amount is None else amount
+        if amount <= 0 or amount > remaining:
+            raise Exception(f"Refund amount must be between 0.01 and {remaining}.")
+
+        db.session.add(WashTransactionAdjustment(
+            wash_transaction_id=transaction.wash_transaction_id,
+            adjustment_type="refund",
+            adjustment_amount=amount,
+            adjustment_reason=reason,
+            created_by_user_id=user_id
+        ))
+        # A fully refunded plan wash doesn't count against the plan
+        if amount == remaining:
+            transaction.status = "refunded"
+            WashTransactionServiceLayer._release_plan_quota(transaction)
+
+        try:
+            db.session.commit()
+            return transaction
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def reversed_amount(transaction_id):
+        """Sum of void/refund entries already appended to a ticket."""
+        total = db.session.query(
+            db.func.coalesce(db.func.sum(WashTransactionAdjustment.adjustment_amount), 0)
+        ).filter(
+            WashTransactionAdjustment.wash_transaction_id == transaction_id,
+            WashTransactionAdjustment.adjustment_type.in_(REVERSAL_TYPES)
+        ).scalar()
+        return Decimal(str(total))
+
+    @staticmethod
+    def _release_plan_quota(transaction):
+        if not transaction.client_plan_id:
+            return
+        plan = ClientPlan.query.get(transaction.client_plan_id)
+        if not plan:
+            return
+
+        units = 1
+        if plan.usage_unit == "services":
+            units = WashTransactionService.query.filter_by(
+                wash_transaction_id=transaction.wash_transaction_id
+            ).count()
+        PlanQuotaService.release(plan, units, transaction.logged_at.date())
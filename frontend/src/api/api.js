@@ -99,10 +99,12 @@ export const getActiveServices = async () => {
 /* -----------------------------
    WORKSHEET PREVIEW
 ------------------------------ */
-export const previewTransaction = async (plate, service_ids) => {
+// options.signal (AbortController) lets callers cancel a stale preview
+export const previewTransaction = async (plate, service_ids, options = {}) => {
   const res = await authFetch('/api/worksheet/preview', {
     method: 'POST',
-    body: JSON.stringify({ plate, service_ids })
+    body: JSON.stringify({ plate, service_ids }),
+    signal: options.signal
   });
 
   if (!res.ok) {
@@ -1,12 +1,14 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useMemo } from 'react';
 import { 
     getActiveStaff, 
     lookupVehicle, 
     getVehicleCategories, 
     getActiveServices, 
     submitWorksheet,
-    createVehicle 
+    createVehicle,
+    previewTransaction
 } from '../api/api';
+import { buildPriceIndex, calculatePreview, formatPrice, priceFor } from '../utils/pricing';
 import './DailyWorksheet.css';
 
 const DailyWorksheet = () => {
@@ -20,6 +22,9 @@ const DailyWorksheet = () => {
     const [categories, setCategories] = useState([]);
     const [availableServices, setAvailableServices] = useState([]);
 
+    // Plan quota from the server preview (prices are computed locally)
+    const [planQuota, setPlanQuota] = useState(null);
+
     // Master form state
     const [formData, setFormData] = useState({
         selectedEmployeeIds: [],
@@ -64,19 +69,58 @@ const DailyWorksheet = () => {
 
     const normalizePlate = (p) => p.replace(/[\s-]/g, "").toUpperCase();
 
-    // Calculate live price based on selected services + category
+    // Pricing matrix from /api/services/active, indexed once per load
+    const priceIndex = useMemo(() => buildPriceIndex(availableServices), [availableServices]);
+
+    // Live price computed locally with the same rules as the backend preview
     const calculateLivePrice = () => {
-        let baseTotal = 0;
-        formData.selectedServiceIds.forEach(id => {
-            const service = availableServices.find(s => s.service_id === id);
-            // Pricing logic: find the price for this service specific to the vehicle category
-            const priceObj = service?.pricing?.find(p => p.vehicle_category_id === parseInt(formData.vehicle_category_id));
-            baseTotal += priceObj ? parseFloat(priceObj.base_price) : 0;
+        const preview = calculatePreview({
+            services: availableServices,
+            priceIndex,
+            serviceIds: formData.selectedServiceIds,
+            categoryId: formData.vehicle_category_id,
+            discount: formData.discount,
+            fee: formData.fee
         });
-        const total = baseTotal - parseFloat(formData.discount || 0) + parseFloat(formData.fee || 0);
-        return Math.max(0, total).toFixed(2);
+        return formatPrice(preview.total);
     };
 
+    // Plan status/quota is the only thing the server preview is needed for.
+    // Debounced per vehicle; a newer vehicle cancels the in-flight request.
+    useEffect(() => {
+        setPlanQuota(null);
+        if (!formData.vehicle_id || !formData.plate) return;
+
+        const controller = new AbortController();
+        const timer = setTimeout(async () => {
+            try {
+                const result = await previewTransaction(normalizePlate(formData.plate), [], { signal: controller.signal });
+                if (!result || result.error) return;
+                setFormData(prev => ({
+                    ...prev,
+                    plan_active: result.plan_active,
+                    client_plan_id: result.client_plan_id,
+                    payment_method: result.plan_active ? 'plan' : prev.payment_method
+                }));
+                if (result.quota_limit !== null && result.quota_limit !== undefined) {
+                    setPlanQuota({
+                        limit: result.quota_limit,
+                        unit: result.quota_unit,
+                        remaining: result.quota_remaining
+                    });
+                }
+            } catch (err) {
+                if (err?.name !== 'AbortError') console.error("Plan status error:", err);
+            }
+        }, 400);
+
+        return () => {
+            clearTimeout(timer);
+            controller.abort();
+        };
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [formData.vehicle_id]);
+
     // --- 4. NAVIGATION & VALIDATION ---
     const nextStep = async () => {
         if (step === 1 && formData.selectedEmployeeIds.length === 0) {
@@ -155,7 +199,8 @@ const DailyWorksheet = () => {
             setFormData(prev => ({ 
                 ...prev, 
                 vehicle_id: newVehicle.vehicle_id, 
-                vehicle_category_id: parseInt(formData.vehicle_category_id),
+                // An existing plate keeps its stored category; price from that one
+                vehicle_category_id: newVehicle.vehicle_category_id,
                 plan_active: false 
             }));
             // Transition to step 3 automatically after creation
@@ -328,9 +373,14 @@ const DailyWorksheet = () => {
             {step === 3 && (
                 <div className="step-container">
                     <h3>Select Services</h3>
+                    {planQuota && (
+                        <div className="banner-info">
+                            Plan quota remaining this cycle: {planQuota.remaining} of {planQuota.limit} {planQuota.unit}
+                        </div>
+                    )}
                     <div className="service-list">
                         {availableServices.map(svc => {
-                            const price = svc.pricing?.find(p => p.vehicle_category_id === parseInt(formData.vehicle_category_id))?.base_price || "0.00";
+                            const price = formatPrice(priceFor(priceIndex, svc.service_id, formData.vehicle_category_id));
                             return (
                                 <label key={svc.service_id} className="service-item">
                                     <input 
@@ -0,0 +1,82 @@
+/**
+ * ============================================================
+ * PRICING UTILITIES
+ * ------------------------------------------------------------
+ * Client-side copy of the backend price preview
+ * (WashTransactionServiceLayer.preview_transaction):
+ *
+ *  - Each service is priced for the vehicle's category
+ *    (missing price tier = 0.00)
+ *  - total = sum(services) - discount + fee
+ *  - total never goes below 0.00
+ *
+ * Everything is computed in integer cents so results match the
+ * backend's Decimal arithmetic (no 0.1 + 0.2 drift).
+ * ============================================================
+ */
+
+
+/**
+ * Convert a price ("12.50", 12.5, "") to integer cents
+ */
+const toCents = (value) => {
+  const amount = parseFloat(value);
+  return Number.isFinite(amount) ? Math.round(amount * 100) : 0;
+};
+
+
+/**
+ * Build a lookup of "serviceId:categoryId" -> cents
+ * from the /api/services/active pricing matrix.
+ * Build once per services list (e.g. with useMemo).
+ */
+export const buildPriceIndex = (services) => {
+  const index = new Map();
+  services.forEach(service => {
+    (service.pricing || []).forEach(p => {
+      index.set(`${service.service_id}:${p.vehicle_category_id}`, toCents(p.base_price));
+    });
+  });
+  return index;
+};
+
+
+/**
+ * Price of one service for a vehicle category, as a number (0 if no tier)
+ */
+export const priceFor = (priceIndex, serviceId, categoryId) =>
+  (priceIndex.get(`${serviceId}:${parseInt(categoryId)}`) || 0) / 100;
+
+
+/**
+ * Calculate the live price preview.
+ * Returns: { services: [{ service_id, service_name, price }], total }
+ * where prices are numbers rounded to 2 decimals.
+ */
+export const calculatePreview = ({ services, priceIndex, serviceIds, categoryId, discount, fee }) => {
+  const category = parseInt(categoryId);
+  let totalCents = 0;
+
+  const lines = serviceIds.map(id => {
+    const cents = priceIndex.get(`${id}:${category}`) || 0;
+    totalCents += cents;
+    return {
+      service_id: id,
+      service_name: services.find(s => s.service_id === id)?.service_name,
+      price: cents / 100
+    };
+  });
+
+  totalCents = totalCents - toCents(discount) + toCents(fee);
+
+  return {
+    services: lines,
+    total: Math.max(0, totalCents) / 100
+  };
+};
+
+
+/**
+ * Format a price for display: 12.5 -> "12.50"
+ */
+export const formatPrice = (amount) => amount.toFixed(2);